@@ -0,0 +1,26 @@
+"""Per-stage benchmarks of the transliteration pipeline over the shipped corpora.
+
+Usage:
+    python benchmark.py                       # shipped corpora, scales 1 and 4
+    python benchmark.py --scale 1 8 --stages universal transliterate
+    python benchmark.py --compare exp/bench/a.json exp/bench/b.json
+    python benchmark.py --imports             # import times, fails if too slow
+
+Same as mmt benchmark (see src/mt_/benchmark.py), with the defaults of a
+checkout: data/ corpora, results saved in exp/bench and the import check
+covering utils as well.
+"""
+
+import argparse
+import sys
+
+from src.mt_.benchmark import add_arguments, main
+
+if __name__ == "__main__":
+    parser = add_arguments(argparse.ArgumentParser(description=__doc__.split("\n")[0]))
+    parser.set_defaults(
+        corpus=["data/words.txt", "data/labelled_data.txt"],
+        output="exp/bench",
+        import_modules=["src.mt_", "utils"],
+    )
+    sys.exit(main(parser.parse_args()))
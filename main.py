@@ -1,13 +1,22 @@
+"""Run the transliterator from a checkout.
+
+Usage:
+    python main.py transliterate data/words.txt -o data/output.txt
+    python main.py evaluate data/labelled_data.txt
+
+Same commands as mmt (see src/mt_/cli.py). run() and eval() are the
+scripted runs over the files in data/ and exp/.
+"""
+
+import sys
 from pathlib import Path
-from src.mt_ import MMTransliteration
-from utils import (
-    create_wordmap,
-    evaluate,
-    get_target_dict,
-)
+
+from src.mt_ import MMTransliteration, labelled_wordmap
+from src.mt_.cli import main
+from utils import create_wordmap, evaluate
 
 
-def run(mk_wmap: bool = True) -> None:
+def run(mk_wmap: bool = True, jobs: int | None = 1) -> None:
     mt = MMTransliteration()
 
     root_dir = "data"
@@ -16,7 +25,7 @@ def run(mk_wmap: bool = True) -> None:
     wordmap_path = f"{root_dir}/wordmap"
 
     content: str = Path(data_path).read_text(encoding="utf-8")
-    output: str = mt.correct_words(content)
+    output: str = "\n".join(mt.transliterate_batch(content.split("\n"), jobs=jobs))
     Path(output_path).write_text(output, encoding="utf-8")
     Path(output_path).with_suffix(".min").write_text(
         "\n".join(
@@ -33,12 +42,10 @@ def eval() -> None:
     root_dir = "exp"
     output_path = f"{root_dir}/output.txt"
     labelled_data_path = f"{root_dir}/labelled_data.txt"
-    target_dict = get_target_dict(labelled_data_path)
-    words = sorted(target_dict.keys())
-    output_dict = {word: mt.transliterate(word) for word in words}
-    evaluate(target_dict=target_dict, output_dict=output_dict)
+    with labelled_wordmap(labelled_data_path) as target:
+        output_dict = {word: mt.transliterate(word) for word in target.keys()}
+        evaluate(target_dict=target, output_dict=output_dict)
 
 
 if __name__ == "__main__":
-    # run()
-    eval()
+    sys.exit(main())
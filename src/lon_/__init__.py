@@ -1,9 +1,20 @@
-from .basic import PoA, MoA, MMPhoneme, ARPABETPhoneme, MeeteiMayek, Bengali
+from .basic import (
+    PoA,
+    MoA,
+    CharClass,
+    Shared,
+    MMPhoneme,
+    ARPABETPhoneme,
+    MeeteiMayek,
+    Bengali,
+)
 
 
 __all__ = [
     "PoA",
     "MoA",
+    "CharClass",
+    "Shared",
     "MMPhoneme",
     "ARPABETPhoneme",
     "MeeteiMayek",
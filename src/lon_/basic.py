@@ -1,5 +1,9 @@
-from enum import Enum
-from typing import Dict, List, Set, Tuple
+from enum import Enum, IntFlag
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class PoA(Enum):
@@ -26,9 +30,63 @@ class MoA(Enum):
     LATEAL_TAP_FLAP = "lateral tap/flap"
 
 
+class CharClass(IntFlag):
+    """Character classes stored in the codepoint-indexed class tables"""
+
+    NONE = 0
+    INDEPENDENT_VOWEL = 1
+    INDEPENDENT_CONSONANT = 2
+    DEPENDENT_VOWEL = 4
+    DEPENDENT_CONSONANT = 8
+    VIRAMA = 16
+    LONSUM = 32
+    DIGIT = 64
+
+
+# 0. Shared Inventory
+class Shared:
+    """Mixin providing one frozen, process-wide instance of an inventory."""
+
+    _frozen: bool = False
+
+    @classmethod
+    def shared(cls):
+        """Get the shared read-only instance, building it on first use."""
+        instance = cls.__dict__.get("_shared_instance")
+        if instance is None:
+            instance = cls()
+            instance.freeze()
+            cls._shared_instance = instance
+        return instance
+
+    def freeze(self) -> None:
+        """Make the instance read-only. Sets become frozensets and dicts become
+        read-only mappings."""
+        for name, value in vars(self).items():
+            if isinstance(value, set):
+                object.__setattr__(self, name, frozenset(value))
+            elif isinstance(value, dict):
+                object.__setattr__(self, name, MappingProxyType(value))
+        object.__setattr__(self, "_frozen", True)
+
+    def __setattr__(self, name: str, value) -> None:
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} instance is frozen")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} instance is frozen")
+        super().__delattr__(name)
+
+
 # 1. Phoneme Inventory
+# SSP of characters that are neither a phoneme nor an IPA symbol
+_SSP_ERROR = ((-1, "Error"), (-1, "Error"))
+
+
 # 1.1. Meetei Mayek Phoneme
-class MMPhoneme:
+class MMPhoneme(Shared):
     """
     Class representing the phoneme inventory of Meetei Mayek.
 
@@ -39,8 +97,31 @@ class MMPhoneme:
         to_phoneme_map (Dict[str, str]): Mapping of IPA symbols to phonemes.
         feats_consonant (Dict[str, Tuple[Tuple[int, int], Tuple[int, int, bool, bool]]]): Features for consonant phonemes.
         feats_vowels (Dict[str, Tuple[int, int, bool]]): Features for vowel phonemes.
+        consonant_set (Set[str]): Consonant phonemes.
+        vowel_set (Set[str]): Vowel phonemes (monophthongs and diphthongs).
+        phonemes (Tuple[str, ...]): Phonemes by ID. ID 0 ("") stands for no phoneme.
+        phoneme_ids (Dict[str, int]): Stable small-integer ID of every phoneme.
+        sievers_by_id (Tuple[int, ...]): Sievers SSP value by phoneme ID.
+        vowel_by_id (bytes): 1 for vowel phonemes by phoneme ID.
+        parker_by_id (Tuple[int, ...]): Parker SSP value by phoneme ID.
+        features_by_id (bytes): Dense feature table, one row of len(FEATURES)
+            signed bytes per phoneme ID (-1 where a feature does not apply).
     """
 
+    # Columns of features_by_id. Place and manner are indices into PoA and
+    # MoA, backness/height/rounded are the vowel features of monophthongs.
+    FEATURES: Tuple[str, ...] = (
+        "sievers",
+        "parker",
+        "place",
+        "manner",
+        "voiced",
+        "vowel",
+        "backness",
+        "height",
+        "rounded",
+    )
+
     def __init__(self) -> None:
         """Initialize the Meetei Mayek phoneme inventory."""
         self.ssp_sievers = {
@@ -66,6 +147,31 @@ class MMPhoneme:
         self._define_phonemes()
         self.to_ipa_map, self.to_phoneme_map = self._generate_maps()
         self.feats_consonant, self.feats_vowels = self._generate_features()
+        self.consonant_set: Set[str] = set(self.feats_consonant)
+        self.vowel_set: Set[str] = set(self.to_ipa_map).difference(self.consonant_set)
+        # phoneme or IPA -> (Sievers SSP, Parker SSP)
+        self._ssp: Dict[str, Tuple[Tuple[int, str], Tuple[int, str]]] = {
+            chars: (
+                self._get_ssp(chars, 0, self.ssp_sievers),
+                self._get_ssp(chars, 1, self.ssp_parker),
+            )
+            for chars in (*self.to_ipa_map, *self.to_phoneme_map)
+        }
+        # Phoneme IDs (in definition order) and tables indexed by them
+        self.phonemes: Tuple[str, ...] = ("", *self.to_ipa_map)
+        self.phoneme_ids: Dict[str, int] = {
+            phoneme: idx for idx, phoneme in enumerate(self.phonemes)
+        }
+        self.sievers_by_id: Tuple[int, ...] = tuple(
+            self.get_seivers(phoneme)[0] for phoneme in self.phonemes
+        )
+        self.vowel_by_id: bytes = bytes(
+            phoneme in self.vowel_set for phoneme in self.phonemes
+        )
+        self.parker_by_id: Tuple[int, ...] = tuple(
+            self.get_parker(phoneme)[0] for phoneme in self.phonemes
+        )
+        self.features_by_id: bytes = self._generate_feature_table()
 
     def _define_phonemes(self) -> None:
         """Define the 36 phonemes of Meetei Mayek."""
@@ -237,11 +343,76 @@ class MMPhoneme:
 
     def get_seivers(self, chars: str) -> Tuple[int, str]:
         """Get Sievers SSP value and name for a given character."""
-        return self._get_ssp(chars, 0, self.ssp_sievers)
+        return self._ssp.get(chars, _SSP_ERROR)[0]
 
     def get_parker(self, chars: str) -> Tuple[int, str]:
         """Get Parker SSP value and name for a given character."""
-        return self._get_ssp(chars, 1, self.ssp_parker)
+        return self._ssp.get(chars, _SSP_ERROR)[1]
+
+    def _generate_feature_table(self) -> bytes:
+        """Generate the rows of features_by_id."""
+        places, manners = list(PoA), list(MoA)
+        rows = bytearray()
+        for phoneme in self.phonemes:
+            row = [
+                self.get_seivers(phoneme)[0],
+                self.get_parker(phoneme)[0],
+                -1,
+                -1,
+                -1,
+                int(phoneme in self.vowel_set),
+                -1,
+                -1,
+                -1,
+            ]
+            if phoneme in self.feats_consonant:
+                place, manner, voiced = self.feats_consonant[phoneme][1]
+                row[2:5] = places.index(place), manners.index(manner), int(voiced)
+            elif phoneme in self.feats_vowels:
+                row[6:9] = map(int, self.feats_vowels[phoneme])
+            rows.extend(value & 0xFF for value in row)
+        return bytes(rows)
+
+    def get_ids(self, phonemes: Iterable[str]) -> bytes:
+        """Phoneme IDs of a sequence of phonemes (0 for unknown ones)."""
+        return bytes(self.phoneme_ids.get(phoneme, 0) for phoneme in phonemes)
+
+    def feature_matrix(self) -> "np.ndarray":
+        """Read-only (phoneme ID x FEATURES) int8 view of features_by_id."""
+        import numpy as np
+
+        return np.frombuffer(self.features_by_id, dtype=np.int8).reshape(
+            len(self.phonemes), len(self.FEATURES)
+        )
+
+    def sonority_profile(
+        self, phoneme_ids: Sequence[int], scale: str = "sievers"
+    ) -> "np.ndarray":
+        """Sonority values (see FEATURES for the scales) of a sequence of
+        phoneme IDs, e.g. a bytes or array('B') from get_ids or
+        B2P.to_phoneme_ids."""
+        import numpy as np
+
+        ids = np.frombuffer(bytes(phoneme_ids), dtype=np.uint8)
+        return self.feature_matrix()[ids, self.FEATURES.index(scale)]
+
+    def sonority_profiles(
+        self, sequences: Iterable[Sequence[int]], scale: str = "sievers"
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Sonority values of many phoneme ID sequences in one lookup.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: flat int8 array of the values of all
+            sequences and offsets, the values of sequence i being
+            values[offsets[i]:offsets[i + 1]].
+        """
+        import numpy as np
+
+        chunks = list(map(bytes, sequences))
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, chunks), np.int64, len(chunks)), out=offsets[1:])
+        values = self.sonority_profile(b"".join(chunks), scale)
+        return values, offsets
 
 
 # 1.2 ARPAbet Phoneme
@@ -373,7 +544,7 @@ class ARPABETPhoneme:
 
 # 2. Language Alphabet Inventory
 # 2.0. Alphabet Class
-class Alphabet:
+class Alphabet(Shared):
     """Base class for language alphabets."""
 
     def __init__(self) -> None:
@@ -382,6 +553,7 @@ class Alphabet:
         self._define_extras()
         self._define_ranges()
         self._define_sets()
+        self._define_class_table()
 
     def _define_alphabet(self) -> None:
         """Initialize alphabet characters."""
@@ -399,6 +571,27 @@ class Alphabet:
         """Initialize character sets."""
         pass
 
+    def _define_class_table(self) -> None:
+        """Initialize codepoint-indexed character class table."""
+        self.block_start: int = 0
+        self.class_table: bytes = bytes()
+
+    def _build_class_table(
+        self, block_start: int, block_size: int, class_sets: Dict[CharClass, Set[str]]
+    ) -> bytes:
+        """Build a class table where each byte holds the CharClass flags of the
+        character at that offset from the block start."""
+        table = bytearray(block_size)
+        for char_class, char_set in class_sets.items():
+            for char in char_set:
+                table[ord(char) - block_start] |= char_class
+        return bytes(table)
+
+    def get_class(self, char: str) -> int:
+        """Get the CharClass flags of a character (0 if outside the block)."""
+        offset = ord(char) - self.block_start
+        return self.class_table[offset] if 0 <= offset < len(self.class_table) else 0
+
     def has_char(self, char: str) -> bool:
         """Check if the character exists in the alphabet."""
         return self.check_in_range(self.alphabet_range, char)
@@ -552,6 +745,30 @@ class MeeteiMayek(Alphabet):
         }
         self.d2i_v_map = {val: key for key, val in self.i2d_v_map.items()}
 
+    def _define_class_table(self) -> None:
+        """Initialize codepoint-indexed character class table."""
+        self.block_start: int = 0xABC0
+        self.class_table: bytes = self._build_class_table(
+            self.block_start,
+            64,
+            {
+                CharClass.INDEPENDENT_VOWEL: self.mapum_vowel_set.union(
+                    self.lonsum_vowel_set
+                ),
+                CharClass.INDEPENDENT_CONSONANT: self.mapum_consonant_set.union(
+                    self.lonsum_consonant_set
+                ),
+                CharClass.DEPENDENT_VOWEL: self.cheitap_vowel_set,
+                CharClass.DEPENDENT_CONSONANT: self.cheitap_consonant_set,
+                CharClass.LONSUM: self.lonsum_set,
+                CharClass.VIRAMA: {self.apun_iyek},
+                CharClass.DIGIT: {
+                    chr(char)
+                    for char in range(ord(self.digit_zero), ord(self.digit_nine) + 1)
+                },
+            },
+        )
+
     def get_independent_diphthongs(self, chars: str):
         if chars == self.vowel_inap:
             return self.letter_i
@@ -639,6 +856,7 @@ class Bengali(Alphabet):
         self.letter_ssa: str = "\u09b7"  # \u09b7 -> ষ
         self.letter_sa: str = "\u09b8"  # \u09b8 -> স
         self.letter_h: str = "\u09b9"  # \u09b9 -> হ
+        self.sign_nukta: str = "\u09bc"  # \u09bc -> ়
         self.vowel_aa: str = "\u09be"  # \u09be -> া
         self.vowel_i: str = "\u09bf"  # \u09bf -> ি
         self.vowel_ii: str = "\u09c0"  # \u09c0 -> ী
@@ -721,3 +939,22 @@ class Bengali(Alphabet):
 
         # Independent Diphthongs
         self.dependent_diphthongs_set: Set[str] = set()
+
+    def _define_class_table(self) -> None:
+        """Initialize codepoint-indexed character class table."""
+        self.block_start: int = 0x0980
+        self.class_table: bytes = self._build_class_table(
+            self.block_start,
+            128,
+            {
+                CharClass.INDEPENDENT_VOWEL: self.independent_vowel_set,
+                CharClass.INDEPENDENT_CONSONANT: self.independent_consonant_set,
+                CharClass.DEPENDENT_VOWEL: self.dependent_vowel_set,
+                CharClass.DEPENDENT_CONSONANT: self.dependent_consonant_set,
+                CharClass.VIRAMA: {self.sign_virama},
+                CharClass.DIGIT: {
+                    chr(char)
+                    for char in range(ord(self.digit_zero), ord(self.digit_nine) + 1)
+                },
+            },
+        )
@@ -1,94 +1,443 @@
-from enum import Enum
-from typing import Dict, List
-
-from tqdm import tqdm
+from array import array
+from importlib import import_module
+from itertools import chain
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, Iterator, List, Tuple
 
 from .b2m import B2P, P2M, Tag, Delimiter
-from ..lon_ import Bengali, MMPhoneme
-
-__all__ = ["MMTransliteration", "B2P", "P2M", "Tag", "Delimiter", "make_tokens"]
-
-
-class Marker(Enum):
-    NULL = "x"
-    CONTINUOUS = "C"
-    BOUNDARY = "B"
-    ERROR = "e"
+from .cache import CacheInfo, PersistentCache, WordCache, rules_version
+from .replace import CharmapReplacer, compile_charmap
+from .reverse import M2B
+from .metrics import Instrumentation, MemorySink, MetricsSink, instrumentation
+from .shape import ShapeInfo, ShapeSyllabifier
+from .transducer import SyllableTransducer, TransducerInfo
+from .stream import Source, iter_chunks, iter_lines, stream_words
+from ..lon_ import Bengali, CharClass, MeeteiMayek, MMPhoneme
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    import numpy as np
+
+    from .lexicon import Lexicon
+
+__all__ = [
+    "MMTransliteration",
+    "B2P",
+    "P2M",
+    "M2B",
+    "Tag",
+    "Delimiter",
+    "make_tokens",
+    "generate_universal_tags",
+    "CharmapReplacer",
+    "compile_charmap",
+    "WordCache",
+    "CacheInfo",
+    "PersistentCache",
+    "rules_version",
+    "instrumentation",
+    "Instrumentation",
+    "MemorySink",
+    "MetricsSink",
+    "levenshtein",
+    "levenshtein_batch",
+    "compute_metrics",
+    "ShapeSyllabifier",
+    "ShapeInfo",
+    "SyllableTransducer",
+    "TransducerInfo",
+    "syllabify",
+    "phonemize",
+    "spell",
+    "split_syllable_phonemes",
+    "to_mm",
+    "corpus_sonority",
+    "CorpusSonority",
+    "WordmapWriter",
+    "write_wordmap",
+    "MappedWordmap",
+    "labelled_wordmap",
+    "Lexicon",
+]
+
+# Names loaded from their submodule on first access, so importing the package
+# does not pull in process pools or evaluation helpers
+_LAZY_ATTRIBUTES = {
+    "levenshtein": "distance",
+    "levenshtein_batch": "distance",
+    "compute_metrics": "distance",
+    "transliterate_parallel": "parallel",
+    "corpus_sonority": "sonority",
+    "CorpusSonority": "sonority",
+    "WordmapWriter": "wordmap",
+    "write_wordmap": "wordmap",
+    "MappedWordmap": "wordmap",
+    "labelled_wordmap": "wordmap",
+    "Lexicon": "lexicon",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__), name)
+    globals()[name] = value
+    return value
 
 
 class MMTransliteration:
 
-    def __init__(self, delimiter: str = "/") -> None:
+    def __init__(
+        self,
+        delimiter: str = "/",
+        cache_size: int = 1 << 16,
+        cache_path: str | Path | None = None,
+        lexicon: "Lexicon | str | Path | None" = None,
+        rule_cache_size: int = 1 << 16,
+    ) -> None:
+        """
+        Args:
+            delimiter (str): syllable delimiter
+            cache_size (int): number of words kept in the in-memory cache
+            cache_path (str | Path | None): SQLite file of a persistent cache
+            lexicon (Lexicon | str | Path | None): exception lexicon whose words
+                are output as they are stored instead of by the rules, or its
+                path (a lexicon file, or labelled data as .txt)
+            rule_cache_size (int): number of word shapes and of syllables whose
+                compiled rules are kept (see SyllableTransducer)
+        """
         self.delimiter = delimiter
+        self.bn = Bengali.shared()
+        self.virama = self.bn.sign_virama
+        self.cache = WordCache(maxsize=cache_size)
+        self.transducer = SyllableTransducer(maxsize=rule_cache_size)
+        if isinstance(lexicon, (str, Path)):
+            from .lexicon import open_lexicon
+
+            lexicon = open_lexicon(lexicon)
+        self.lexicon = lexicon
+        self.persistent_cache = (
+            PersistentCache(cache_path, rules_version(lexicon)) if cache_path else None
+        )
 
-    def transliterate_words(self, text: str) -> str:
-        bn = Bengali()
-        b2p = B2P()
-        words = []
-        for word in tqdm(text.split(), desc="Transliterating..."):
-            words.append(self.transliterate(text=word, bn=bn, e2b=b2p))
-        return "\n".join(words)
-
-    def transliterate(self, text: str, bn: Bengali | None, b2P: B2P | None) -> str:
-        if bn == None or b2p == None:
-            bn = Bengali()
-            b2p = B2P()
-
-        self.virama = bn.sign_virama
-
-        # Step 0: Adjusting s550 characters
-        char_markers = self.__gen_markers(text)
-
-        # Returns final content
-        return text
-
-    def __gen_markers(self, text) -> str:
-        """Generate Universal Markers. Based on each consecutive charactres
+    def __enter__(self) -> "MMTransliteration":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+
+    def transliterate_words(self, text: str, use_cache: bool = True) -> str:
+        words = text.split()
+        if use_cache and self.persistent_cache is not None:
+            self.__load_cached(words)
+        from tqdm import tqdm
+
+        outputs = []
+        for word in tqdm(words, desc="Transliterating..."):
+            outputs.append(self.transliterate(text=word, use_cache=use_cache))
+        if self.persistent_cache is not None:
+            self.persistent_cache.flush()
+        return "\n".join(outputs)
+
+    def transliterate_batch(
+        self,
+        words: List[str],
+        jobs: int | None = None,
+        chunk_size: int = 1000,
+        use_cache: bool = True,
+        executor: "Executor | None" = None,
+    ) -> List[str]:
+        """Transliterate a list of words in a process pool.
+
+        Words found in the caches are not sent to the workers and each distinct
+        word is computed once. Outputs are returned in input order.
 
         Args:
-            word (str): input word
+            words (List[str]): input words
+            jobs (int | None): number of worker processes (default: CPU count,
+                1 runs in this process)
+            chunk_size (int): number of words sent to a worker at a time
+            use_cache (bool): look up and store outputs in the caches
+            executor (Executor | None): pool from worker_pool, reused instead
+                of starting workers for this call
+        """
+        from .parallel import transliterate_parallel
+
+        options = self.__worker_options()
+        if not use_cache:
+            if jobs == 1 and executor is None:
+                return [self.__transliterate(word) for word in words]
+            return list(
+                transliterate_parallel(words, jobs, chunk_size, options, executor)
+            )
+
+        outputs: Dict[str, str] = {}
+        if self.persistent_cache is not None:
+            self.__load_cached(words)
+        for word in dict.fromkeys(words):
+            output = self.cache.get(word)
+            if output is not None:
+                outputs[word] = output
+        missing = [word for word in dict.fromkeys(words) if word not in outputs]
+        if jobs == 1 and executor is None:
+            computed = map(self.__transliterate, missing)
+        else:
+            computed = transliterate_parallel(
+                missing, jobs, chunk_size, options, executor
+            )
+        for word, output in zip(missing, computed):
+            outputs[word] = output
+            self.cache.put(word, output)
+            if self.persistent_cache is not None:
+                self.persistent_cache.put(word, output)
+        if self.persistent_cache is not None:
+            self.persistent_cache.flush()
+        return [outputs[word] for word in words]
+
+    def worker_pool(self, jobs: int | None = None) -> ContextManager["Executor"]:
+        """Process pool of workers equivalent to this transliterator, to pass as
+        executor to repeated transliterate_batch calls."""
+        from .parallel import worker_pool
+
+        return worker_pool(jobs, self.__worker_options())
+
+    def __worker_options(self) -> Dict:
+        """Arguments to build an equivalent transliterator in a worker process.
+        Workers get distinct, uncached words only, so they keep no word cache."""
+        return {
+            "delimiter": self.delimiter,
+            "cache_size": 0,
+            "lexicon": self.lexicon,
+            "rule_cache_size": self.transducer.maxsize,
+        }
+
+    def transliterate_stream(
+        self, source: Source, use_cache: bool = True, chunk_size: int = 1 << 16
+    ) -> Iterator[str]:
+        """Transliterate a file path, file object or iterable of lines, yielding
+        transliterated chunks. Only Bengali words are replaced, so whitespace,
+        punctuation and line breaks are preserved, and memory stays bounded by
+        chunk_size.
         """
-        char_markers = [Marker.NULL] * (len(text) + 1)
-        char_markers[-1] = Marker.BOUNDARY
-        for idx in range(len(text) - 1, 0, -1):
-            char_markers[idx] = self.mark_two_chars(text[idx - 1], text[idx])
-        char_markers[0] = Marker.BOUNDARY
-        return char_markers
+        convert = self.__transliterate_cached if use_cache else self.__transliterate
+        yield from stream_words(iter_chunks(source, chunk_size), convert)
+        if self.persistent_cache is not None:
+            self.persistent_cache.flush()
+
+    def transliterate_file(
+        self,
+        input_path: str | Path,
+        output_path: str | Path,
+        use_cache: bool = True,
+        chunk_size: int = 1 << 16,
+    ) -> None:
+        """Transliterate a file into another one with constant memory."""
+        with open(output_path, mode="w", encoding="utf-8", newline="") as file:
+            for chunk in self.transliterate_stream(input_path, use_cache, chunk_size):
+                file.write(chunk)
+
+    def transliterate(self, text: str, use_cache: bool = False) -> str:
+        if use_cache:
+            return self.__transliterate_cached(text)
+        return self.__transliterate(text)
+
+    def cache_info(self) -> CacheInfo:
+        return self.cache.info()
+
+    def __transliterate_cached(self, word: str) -> str:
+        output = self.cache.get(word)
+        if output is None:
+            if self.persistent_cache is not None:
+                output = self.persistent_cache.get(word)
+            if output is None:
+                output = self.__transliterate(word)
+                if self.persistent_cache is not None:
+                    self.persistent_cache.put(word, output)
+            self.cache.put(word, output)
+        return output
+
+    def __load_cached(self, words: List[str]) -> None:
+        """Load the persistently cached outputs of words into the word cache."""
+        missing = {word for word in words if word not in self.cache}
+        for word, output in self.persistent_cache.get_many(missing).items():
+            self.cache.put(word, output)
+
+    def __transliterate(self, text: str) -> str:
+        if instrumentation.active:
+            instrumentation.observe("word_length", len(text))
+            with instrumentation.timer("transliterate"):
+                return self.__run(text)
+        return self.__run(text)
+
+    def __run(self, text: str) -> str:
+        if self.lexicon is not None:
+            output = self.lexicon.get(text)
+            if output is not None:
+                return output
+        # Syllabify, phonemize and spell in one pass (see SyllableTransducer)
+        return self.transducer.transliterate(text)
 
     # Private methods
     def __adjust_glyph(self, text: str, charmap: Dict[str, str]) -> str:
-        for key, value in charmap.items():
-            text = text.replace(key, value)
-        return text
+        return compile_charmap(charmap).rewrite(text)
 
     def __map_unicode(self, text: str, charmap: Dict[str, str]) -> str:
-        # 1. Mapping to correct unicode values (in or of decreasing size of key length)
-        sorted_keys = sorted(charmap.keys(), key=len, reverse=True)
-        for key in sorted_keys:
-            text = text.replace(key, charmap[key])
-        # 2. Fix redundant virama
-        num_mistypes: int = 2
-        for num in range(num_mistypes + 1, 1, -1):
-            text = text.replace(self.virama * num, self.virama)
-        return text
+        # Mapping to correct unicode values (longest key first) and fixing
+        # redundant virama in one pass
+        return compile_charmap(charmap, virama=self.virama).rewrite(text)
 
 
 #! OLD Which should work
 
 
 # Step 1: Syllabify the bengali text
-def syllabify(word: str) -> str:
-    pass
+def syllabify(word: str, syllable_delimiter: str = "/") -> str:
+    """Insert the delimiter at every syllable boundary of a word. Boundaries
+    left unresolved by the tagging passes (Tag.NULL) are taken as syllable
+    boundaries. Base letter and nukta sequences are composed first (see
+    B2P.compose)."""
+    word = B2P.shared().compose(word)
+    char_markers = generate_contextual_tag(word, generate_universal_tag(word))
+    cuts = [0, *syllable_cuts(char_markers), len(word)]
+    return syllable_delimiter.join(word[a:b] for a, b in zip(cuts[:-1], cuts[1:]))
 
 
 # Step 2: Convert into phoneme
 def phonemize(word: str, syllable_delimiter: str = "/") -> str:
-    pass
+    """Phonemes of a syllabified word: syllables are separated by the
+    delimiter and their phonemes (onset, nucleus and coda) by spaces."""
+    if not word:
+        return ""
+    to_phonemes = B2P.shared().to_phonemes
+    return syllable_delimiter.join(
+        " ".join(chain.from_iterable(split_phonemes(to_phonemes(syllable))))
+        for syllable in word.split(syllable_delimiter)
+    )
 
 
 # Step 3: Build Meetei Mayek words
 def spell(word: str, syllable_delimiter: str = "/") -> str:
-    pass
+    """Meetei Mayek spelling of a phonemized word."""
+    if not word:
+        return ""
+    return "".join(
+        write_mm(*split_phonemes(syllable.split()))
+        for syllable in word.split(syllable_delimiter)
+    )
+
+
+# Steps 2 and 3 of a syllabified word, one syllable at a time
+def split_syllable_phonemes(syllable: str) -> Tuple[List[str], List[str], List[str]]:
+    """Onset, nucleus and coda phonemes of a syllable."""
+    return split_phonemes(B2P.shared().to_phonemes(syllable))
+
+
+def to_mm(syllabified_word: str, syllable_delimiter: str = "/") -> str:
+    """Meetei Mayek spelling of a syllabified word, without the phoneme
+    strings of phonemize and spell."""
+    return "".join(
+        write_mm(*split_syllable_phonemes(syllable))
+        for syllable in syllabified_word.split(syllable_delimiter)
+    )
+
+
+# Tags after which a word is split into syllables
+_SYLLABLE_CUTS = frozenset({Tag.BOUNDARY.code, Tag.NULL.code})
+
+
+def syllable_cuts(char_markers: bytearray) -> List[int]:
+    """Indices of the characters starting a new syllable (after the first)."""
+    return [
+        idx
+        for idx in range(1, len(char_markers) - 1)
+        if char_markers[idx] in _SYLLABLE_CUTS
+    ]
+
+
+# f(phonemes of a syllable) = (onset, nucleus, coda)
+def split_phonemes(phonemes: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """Split the phonemes of a syllable around its first run of vowels. Without
+    a vowel, a schwa is inserted after the first of two consonants, or after
+    all of them otherwise. A syllable without phonemes stays empty."""
+    if not phonemes:
+        return [], [], []
+    vowels = MMPhoneme.shared().vowel_set
+    for start, phoneme in enumerate(phonemes):
+        if phoneme in vowels:
+            end = start + 1
+            while end < len(phonemes) and phonemes[end] in vowels:
+                end += 1
+            return phonemes[:start], phonemes[start:end], phonemes[end:]
+    schwa = MMPhoneme.shared().phoneme_x
+    if len(phonemes) == 2:
+        return phonemes[:1], [schwa], phonemes[1:]
+    return list(phonemes), [schwa], []
+
+
+def split_phoneme_ids(phonemes: array) -> Tuple[array, array, array]:
+    """split_phonemes over phoneme IDs (see MMPhoneme.phoneme_ids)."""
+    if not phonemes:
+        return array("B"), array("B"), array("B")
+    mmP = MMPhoneme.shared()
+    vowel = mmP.vowel_by_id
+    for start, phoneme in enumerate(phonemes):
+        if vowel[phoneme]:
+            end = start + 1
+            while end < len(phonemes) and vowel[phonemes[end]]:
+                end += 1
+            return phonemes[:start], phonemes[start:end], phonemes[end:]
+    schwa = array("B", (mmP.phoneme_ids[mmP.phoneme_x],))
+    if len(phonemes) == 2:
+        return phonemes[:1], schwa, phonemes[1:]
+    return phonemes[:], schwa, array("B")
+
+
+# f(onset, nucleus, coda) = mm_string
+def write_mm(onset: List[str], nucleus: List[str], coda: List[str]) -> str:
+    p2m = P2M.shared()
+    begin, end = p2m.mm_begin, p2m.mm_end
+
+    # 1. Onset with begin letters, nucleus with begin letters only without onset
+    onset = [begin.get(phoneme, "") for phoneme in onset]
+    nucleus = [(end if onset else begin).get(phoneme, "") for phoneme in nucleus]
+    coda = [end.get(phoneme, "") for phoneme in coda]
+    return _join_mm(onset, nucleus, coda)
+
+
+def write_mm_ids(onset: array, nucleus: array, coda: array) -> str:
+    """write_mm over phoneme IDs (see MMPhoneme.phoneme_ids)."""
+    p2m = P2M.shared()
+    begin, end = p2m.mm_begin_by_id, p2m.mm_end_by_id
+
+    # 1. Onset with begin letters, nucleus with begin letters only without onset
+    onset = [begin[phoneme] for phoneme in onset]
+    nucleus = [(end if onset else begin)[phoneme] for phoneme in nucleus]
+    coda = [end[phoneme] for phoneme in coda]
+    return _join_mm(onset, nucleus, coda)
+
+
+def _join_mm(onset: List[str], nucleus: List[str], coda: List[str]) -> str:
+    mm = MeeteiMayek.shared()
+
+    # 2. Use nung if ngou lonsum is used without cheitap on its left
+    if (
+        coda
+        and nucleus
+        and coda[0] == mm.letter_ngou_lonsum
+        and nucleus[-1] not in mm.cheitap_set
+    ):
+        coda[0] = mm.vowel_nung
+
+    # 3. Add apun to denote consonants cluster in both onset as well as coda
+    onset = onset[0] if len(onset) == 1 else mm.apun_iyek.join(filter(None, onset))
+    coda = coda[0] if len(coda) == 1 else mm.apun_iyek.join(filter(None, coda))
+    return f"{onset}{''.join(nucleus)}{coda}"
 
 
 # Process all words in a list
@@ -98,14 +447,26 @@ def make_tokens(words: List[str]):
     total_num_unidentified = 0
     total_num_markers = 0
 
-    for idx, word in enumerate(words):
-        # Pass 1: Generate marker based on two consecutive chars
-        char_markers = generate_universal_tag(word)
+    active = instrumentation.active
+    contextual_seconds = 0.0
 
+    # Pass 1: Generate marker based on two consecutive chars (all words at once)
+    with instrumentation.timer("universal"):
+        universal_tags = generate_universal_tags(words)
+
+    for word, char_markers in zip(words, universal_tags):
         # Pass 2: Generate marker based on context
+        if active:
+            instrumentation.observe("word_length", len(word))
+            start = perf_counter()
         char_markers = generate_contextual_tag(word, char_markers)
+        if active:
+            contextual_seconds += perf_counter() - start
+            instrumentation.count("tags.total", len(char_markers))
+            instrumentation.count("tags.null", char_markers.count(Tag.NULL.code))
+            instrumentation.count("tags.error", char_markers.count(Tag.ERROR.code))
 
-        num_unidentified = char_markers.count(Tag.NULL)
+        num_unidentified = char_markers.count(Tag.NULL.code)
         total_num_unidentified += num_unidentified
         total_num_markers += len(char_markers)
         tokens[word] = (
@@ -114,6 +475,8 @@ def make_tokens(words: List[str]):
         if check_markers(char_markers):
             num_completed += 1
 
+    if active:
+        instrumentation.timing("contextual", contextual_seconds)
     print(f"{num_completed}/{len(words)} | {num_completed/len(words):.2f}% (Completed)")
     print(
         f"{total_num_unidentified}/{total_num_markers} | {total_num_unidentified/total_num_markers:.2f}% (Marker Error)"
@@ -122,29 +485,113 @@ def make_tokens(words: List[str]):
 
 
 # Pass 1: Generate tag based on two consecutive chars
-def generate_universal_tag(word: str) -> str:
-    bn = Bengali()
+def generate_universal_tag(word: str) -> bytearray:
+    """Tag codes (Tag.code) of every character boundary of a word, the first
+    and last one being word boundaries."""
+    block_start = Bengali.shared().block_start
+    pair_codes = get_pair_codes()
+    index = [
+        offset if 0 <= offset < _BLOCK_SIZE else _BLOCK_SIZE
+        for offset in (ord(char) - block_start for char in word)
+    ]
+    char_markers = bytearray(len(word) + 1)
+    char_markers[0] = char_markers[-1] = Tag.BOUNDARY.code
+    for idx in range(1, len(word)):
+        char_markers[idx] = pair_codes[index[idx - 1] * _PAIR_STRIDE + index[idx]]
+    return char_markers
 
-    char_markers = [Tag.NULL] * (len(word) + 1)
-    char_markers[-1] = Tag.BOUNDARY
 
-    for idx in range(len(word) - 1, 0, -1):
-        char_markers[idx] = mark_two_chars(word[idx - 1], word[idx], bn=bn)
+# Pass 1 (batch): Generate tags of every word using the pairwise tag matrix
+def generate_universal_tags(words: List[str]) -> List[bytearray]:
+    codes, offsets = universal_tag_codes(words)
+    codes, offsets = codes.tobytes(), offsets.tolist()
+    return [
+        bytearray(codes[start:end]) for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+
+
+def universal_tag_codes(words: List[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Generate universal tags of all words with one lookup into the pair matrix.
+
+    Args:
+        words (List[str]): input words
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: flat uint8 array of tag codes and offsets,
+        where tags of words[i] are codes[offsets[i] : offsets[i + 1]]
+    """
+    import numpy as np
+
+    bn = Bengali.shared()
+    pair_matrix = get_pair_matrix()
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum(lengths + 1, out=offsets[1:])
+    codes = np.full(offsets[-1], Tag.NULL.code, dtype=np.uint8)
+
+    # 1. Pack all words into one array of block offsets (outside the block -> 128)
+    text = "".join(words)
+    index = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    index -= bn.block_start
+    index[(index < 0) | (index >= _BLOCK_SIZE)] = _BLOCK_SIZE
+
+    # 2. Tag every pair of consecutive characters inside a word
+    word_ids = np.repeat(np.arange(len(words)), lengths)
+    is_first = np.zeros(len(text), dtype=bool)
+    is_first[(offsets[:-1] - np.arange(len(words)))[lengths > 0]] = True
+    inner = np.flatnonzero(~is_first)
+    codes[inner + word_ids[inner]] = pair_matrix[index[inner - 1], index[inner]]
+
+    # 3. Word boundaries
+    codes[offsets[:-1]] = Tag.BOUNDARY.code
+    codes[offsets[1:] - 1] = Tag.BOUNDARY.code
+    return codes, offsets
+
+
+_BLOCK_SIZE = 128
+_PAIR_STRIDE = _BLOCK_SIZE + 1
+_pair_codes = None
+
+
+def get_pair_codes() -> bytes:
+    """Tag codes of mark_two_chars for every pair in the Bengali block, built once,
+    as a row-major 129 x 129 table (code of char1, char2 at
+    offset1 * 129 + offset2). Offset 128 stands for any character outside the
+    block."""
+    global _pair_codes
+    if _pair_codes is None:
+        bn = Bengali.shared()
+        chars = [chr(bn.block_start + offset) for offset in range(_BLOCK_SIZE)]
+        chars.append("\0")
+        _pair_codes = bytes(
+            mark_two_chars(char1, char2, bn).code for char1 in chars for char2 in chars
+        )
+    return _pair_codes
 
-    char_markers[0] = Tag.BOUNDARY
-    return char_markers
+
+def get_pair_matrix() -> "np.ndarray":
+    """Read-only 129 x 129 uint8 view of get_pair_codes()."""
+    import numpy as np
+
+    pair_codes = np.frombuffer(get_pair_codes(), dtype=np.uint8)
+    return pair_codes.reshape(_PAIR_STRIDE, _PAIR_STRIDE)
 
 
 # Pass 2: Generate tag based on context
-def generate_contextual_tag(word: str, char_markers: List[str]) -> List[str]:
-    bn = Bengali()
-    mmP = MMPhoneme()
-    b2p = B2P()
+def generate_contextual_tag(word: str, char_markers: bytearray) -> bytearray:
+    NULL, BOUNDARY = Tag.NULL.code, Tag.BOUNDARY.code
+    CONTINUOUS = Tag.CONTINUOUS.code
+    bn = Bengali.shared()
+    sievers = MMPhoneme.shared().sievers_by_id
+    phoneme_id = B2P.shared().get_phoneme_id
     word_len = len(word)
+    # Number of markers resolved by each rule
+    resolved_2_1 = resolved_2_2_1 = resolved_2_2_2 = 0
+    resolved_2_2_3 = resolved_2_2_4 = 0
     # 2.1. (V, C, )
     ptr1 = word_len - 1
-    while ptr1 != 0:
-        if char_markers[ptr1] == Tag.NULL:
+    while ptr1 > 0:
+        if char_markers[ptr1] == NULL:
             char2 = word[ptr1]
             char1 = word[ptr1 - 1]
             # print(
@@ -152,12 +599,13 @@ def generate_contextual_tag(word: str, char_markers: List[str]) -> List[str]:
             # )
             if (
                 ptr1 > 0
-                and char_markers[ptr1 + 1] == Tag.CONTINUOUS
+                and char_markers[ptr1 + 1] == CONTINUOUS
                 and word[ptr1 + 1] != bn.sign_virama
                 and char2 in bn.independent_consonant_set
                 and char1 != bn.sign_virama
             ):
-                char_markers[ptr1] = Tag.BOUNDARY
+                char_markers[ptr1] = BOUNDARY
+                resolved_2_1 += 1
         # Go to previous
         ptr1 -= 1
 
@@ -165,26 +613,28 @@ def generate_contextual_tag(word: str, char_markers: List[str]) -> List[str]:
 
     # 2.2: After virama
     ptr1 = word_len - 1
-    while ptr1 != 0:
-        if char_markers[ptr1] == Tag.NULL and word[ptr1 - 1] == bn.sign_virama:
-            char2, phoneme2 = word[ptr1], b2p.charmap.get(word[ptr1], "")
-            char1, phoneme1 = word[ptr1 - 2], b2p.charmap.get(word[ptr1 - 2], "")
+    while ptr1 > 0:
+        if char_markers[ptr1] == NULL and word[ptr1 - 1] == bn.sign_virama:
+            phoneme2 = phoneme_id(word[ptr1])
+            phoneme1 = phoneme_id(word[ptr1 - 2])
 
-            # print(f"{char1=} | {phoneme1=} | {char2=} | {phoneme2=}")
+            # print(f"{phoneme1=} | {phoneme2=}")
             # 2.2.1. Gemination
             if phoneme1 == phoneme2:
-                char_markers[ptr1] = Tag.BOUNDARY
+                char_markers[ptr1] = BOUNDARY
+                resolved_2_2_1 += 1
             # 2.2.2. Plosive
-            elif (
-                mmP.get_seivers(phoneme1)[0] == 1 and mmP.get_seivers(phoneme2)[0] == 1
-            ):
-                char_markers[ptr1] = Tag.BOUNDARY
+            elif sievers[phoneme1] == 1 and sievers[phoneme2] == 1:
+                char_markers[ptr1] = BOUNDARY
+                resolved_2_2_2 += 1
             # 2.2.3. Fricative
-            elif mmP.get_seivers(phoneme1)[0] == 3 or mmP.get_seivers(phoneme2)[0] == 3:
-                char_markers[ptr1] = Tag.CONTINUOUS
+            elif sievers[phoneme1] == 3 or sievers[phoneme2] == 3:
+                char_markers[ptr1] = CONTINUOUS
+                resolved_2_2_3 += 1
             # 2.2.4. Approximant (Glide in Sievers)
-            elif mmP.get_seivers(phoneme2)[0] == 4:
-                char_markers[ptr1] = Tag.CONTINUOUS
+            elif sievers[phoneme2] == 4:
+                char_markers[ptr1] = CONTINUOUS
+                resolved_2_2_4 += 1
 
             # 2.2.3. Lateral Approximant
             # elif phoneme1 in SIEVERS_PLOSIVE and phoneme2 in SIEVERS_PLOSIVE:
@@ -209,72 +659,78 @@ def generate_contextual_tag(word: str, char_markers: List[str]) -> List[str]:
     #     if char_markers[ptr1] == Tag.NULL:
     #     ptr1 -= 1
 
+    if instrumentation.active:
+        instrumentation.count("rule_2.1", resolved_2_1)
+        instrumentation.count("rule_2.2.1", resolved_2_2_1)
+        instrumentation.count("rule_2.2.2", resolved_2_2_2)
+        instrumentation.count("rule_2.2.3", resolved_2_2_3)
+        instrumentation.count("rule_2.2.4", resolved_2_2_4)
     return char_markers
 
 
 # Universal character type based relations
 def mark_two_chars(char1: str, char2: str, bn: Bengali) -> str:
-    if char2 == bn.sign_virama:
-        return Tag.CONTINUOUS if char1 in bn.independent_consonant_set else Tag.ERROR
-    elif char2 in bn.dependent_vowel_set:
-        if (
-            char1 in bn.independent_consonant_set
-            or f"{char1}{char2}" in bn.dependent_diphthongs_set
+    class1, class2 = bn.get_class(char1), bn.get_class(char2)
+    if class2 & CharClass.VIRAMA:
+        return Tag.CONTINUOUS if class1 & CharClass.INDEPENDENT_CONSONANT else Tag.ERROR
+    elif class2 & CharClass.DEPENDENT_VOWEL:
+        if class1 & CharClass.INDEPENDENT_CONSONANT or (
+            bn.dependent_diphthongs_set
+            and f"{char1}{char2}" in bn.dependent_diphthongs_set
         ):
             return Tag.CONTINUOUS
         else:
             return Tag.ERROR
-    elif char2 in bn.dependent_consonant_set:
-        if char1 in bn.independent_consonant_set.union(
-            bn.independent_vowel_set, bn.dependent_vowel_set
+    elif class2 & CharClass.DEPENDENT_CONSONANT:
+        if class1 & (
+            CharClass.INDEPENDENT_CONSONANT
+            | CharClass.INDEPENDENT_VOWEL
+            | CharClass.DEPENDENT_VOWEL
         ):
             return Tag.CONTINUOUS
         else:
             return Tag.ERROR
-    elif char2 in bn.independent_vowel_set:
-        if char1 in bn.independent_consonant_set.union(
-            bn.independent_vowel_set, bn.independent_consonant_set
-        ):
+    elif class2 & CharClass.INDEPENDENT_VOWEL:
+        if class1 & (CharClass.INDEPENDENT_CONSONANT | CharClass.INDEPENDENT_VOWEL):
             return Tag.BOUNDARY
-        elif f"{char1}{char2}" in bn.dependent_diphthongs_set:
+        elif (
+            bn.dependent_diphthongs_set
+            and f"{char1}{char2}" in bn.dependent_diphthongs_set
+        ):
             return Tag.CONTINUOUS
-        elif char1 in bn.dependent_vowel_set:
+        elif class1 & CharClass.DEPENDENT_VOWEL:
             return Tag.BOUNDARY
         else:
             return Tag.ERROR
-    elif char2 in bn.independent_consonant_set:
-        return Tag.BOUNDARY if char1 in bn.dependent_consonant_set else Tag.NULL
+    elif class2 & CharClass.INDEPENDENT_CONSONANT:
+        return Tag.BOUNDARY if class1 & CharClass.DEPENDENT_CONSONANT else Tag.NULL
     else:
         return Tag.NULL
 
 
 # Utility functions
+# Rendering of the tag after each character by use_markers
+_MARKER_SUFFIX = {
+    Tag.BOUNDARY.code: "/",
+    Tag.NULL.code: "?",
+    Tag.ERROR.code: "*",
+}
+
+
 # 1. For representation
-def use_markers(word: str, markers: List[str]) -> str:
-    output = ""
-    for idx, marker in enumerate(markers[1:]):
-        char = word[idx]
-        if marker == Tag.BOUNDARY:
-            output += f"{char}/"
-        elif marker == Tag.NULL:
-            output += f"{char}?"
-        elif marker == Tag.ERROR:
-            output += f"{char}*"
-        else:
-            output += char
-    return output
+def use_markers(word: str, markers: bytearray) -> str:
+    suffix = _MARKER_SUFFIX
+    return "".join(
+        [char + suffix.get(marker, "") for char, marker in zip(word, markers[1:])]
+    )
 
 
 # 2. For detailed representation
-def mix_markers(word, char_markers):
-    output = ""
-    for idx in range(len(word)):
-        output += char_markers[idx]
-        output += f"-{word[idx]}-"
-    output += char_markers[len(word)]
-    return output
+def mix_markers(word: str, char_markers: bytearray) -> str:
+    tags = char_markers.decode("ascii")
+    return "".join([f"{tag}-{char}-" for tag, char in zip(tags, word)]) + tags[-1]
 
 
 # 3. For checking whether syllabification is complete
-def check_markers(markers: List[str]) -> bool:
-    return False if Tag.NULL in markers else True
+def check_markers(markers: bytearray) -> bool:
+    return Tag.NULL.code not in markers
@@ -1,9 +1,11 @@
+import re
+import unicodedata
+from array import array
 from enum import Enum
 from typing import Dict, List, Tuple
 
-from lon_.basic import Bengali, MeeteiMayek
-
-from ..lon_ import ARPABETPhoneme, MMPhoneme
+from ..lon_ import ARPABETPhoneme, Bengali, MeeteiMayek, MMPhoneme, Shared
+from .trie import CharTrie
 
 
 class Tag(Enum):
@@ -15,6 +17,11 @@ class Tag(Enum):
     # Extra
     ERROR = "e"
 
+    @property
+    def code(self) -> int:
+        """Byte code of the tag used in compact tag arrays"""
+        return ord(self.value)
+
 
 class Delimiter(Enum):
     """Delimiters used in Syllabification"""
@@ -23,12 +30,12 @@ class Delimiter(Enum):
     UNCLEAR = "?"
 
 
-class B2P:
+class B2P(Shared):
     """Bengali to Phoneme"""
 
     def __init__(self) -> None:
-        bn = Bengali()
-        mmP = MMPhoneme()
+        bn = Bengali.shared()
+        mmP = MMPhoneme.shared()
 
         original_map: Dict[str, List[str]] = {
             mmP.phoneme_k: [bn.letter_ka],
@@ -58,7 +65,7 @@ class B2P:
                 bn.letter_rha,
             ],
             mmP.phoneme_w: [bn.letter_w],
-            mmP.phoneme_l: [bn.letter_l],
+            mmP.phoneme_l: [bn.letter_la],
             mmP.phoneme_s: [bn.letter_cha, bn.letter_ssa, bn.letter_sa, bn.letter_sha],
             mmP.phoneme_h: [bn.letter_h],
             # vowels - monophthongs
@@ -116,7 +123,7 @@ class B2P:
                 f"{bn.vowel_aa}{bn.letter_uu}",
                 f"{bn.vowel_aa}{bn.letter_o}",
             ],
-            mmP.phoneme_xu: [bn.letter_ao, bn.vowel_ao],
+            mmP.phoneme_xu: [bn.letter_ao, bn.vowel_au],
         }
 
         self.charmap: Dict[str, str] = {
@@ -124,18 +131,73 @@ class B2P:
             for phoneme, char_bn_list in original_map.items()
             for char_bn in char_bn_list
         }
+        # Longest-match tokenizer (single characters and diphthong pairs)
+        self.tokenizer: CharTrie[str] = CharTrie(self.charmap)
+
+        # Same mapping with phoneme IDs: a longest-match tokenizer and a
+        # codepoint-indexed table of single characters (0 for none)
+        ids = {
+            chars: mmP.phoneme_ids[phoneme] for chars, phoneme in self.charmap.items()
+        }
+        self.id_tokenizer: CharTrie[int] = CharTrie(ids)
+        self.block_start: int = bn.block_start
+        self.phoneme_id_table: bytes = bytes(
+            ids.get(chr(bn.block_start + offset), 0) for offset in range(128)
+        )
+        # Runs of characters spelt from phonemes: those with a phoneme, viramas
+        # (which join consonants) and candrabindus and visargas (which have no
+        # phoneme but belong to the syllable before them). Other characters
+        # have nothing to spell and are kept as they are.
+        spelt = {char for chars in self.charmap for char in chars}
+        spelt.update((bn.sign_virama, bn.sign_candrabindu, bn.sign_visarga))
+        self.spelt_pattern: re.Pattern = re.compile(
+            f"[{''.join(map(re.escape, sorted(spelt)))}]+"
+        )
+        # NFC text keeps ড়, ঢ় and য় as their base letter and a nukta, while
+        # the rules are written for the precomposed letters
+        self.nukta: str = bn.sign_nukta
+        self.precomposed: Dict[str, str] = {
+            unicodedata.normalize("NFD", letter): letter
+            for letter in (bn.letter_rra, bn.letter_rha, bn.letter_yya)
+        }
+
+    def compose(self, word: str) -> str:
+        """Replace base letter and nukta sequences by precomposed letters."""
+        if self.nukta in word:
+            for sequence, letter in self.precomposed.items():
+                word = word.replace(sequence, letter)
+        return word
 
+    def to_phonemes(self, word: str) -> List[str]:
+        """Convert a word into phonemes in one left-to-right longest-match pass.
+        Characters without a phoneme (e.g. virama) are skipped."""
+        return self.tokenizer.translate(word)
 
-class P2M:
+    def to_phonemes_batch(self, words: List[str]) -> List[List[str]]:
+        """Convert every word of a list into phonemes."""
+        translate = self.tokenizer.translate
+        return [translate(word) for word in words]
+
+    def to_phoneme_ids(self, word: str) -> array:
+        """Like to_phonemes, with phoneme IDs (see MMPhoneme.phoneme_ids)."""
+        return array("B", self.id_tokenizer.translate(word))
+
+    def get_phoneme_id(self, char: str) -> int:
+        """Phoneme ID of a single character (0 if it has no phoneme)."""
+        offset = ord(char) - self.block_start
+        return self.phoneme_id_table[offset] if 0 <= offset < 128 else 0
+
+
+class P2M(Shared):
     """Phoneme to Meetei Mayek"""
 
     def __init__(self) -> None:
-        mmP = MMPhoneme()
-        mm = MeeteiMayek()
+        mmP = MMPhoneme.shared()
+        mm = MeeteiMayek.shared()
 
         original_map: Dict[str, Tuple[str, str, str]] = {
             mmP.phoneme_k: (mm.letter_kok, mm.letter_kok_lonsum, mm.letter_kok_lonsum),
-            mmP.phoneme_kh: (mm.letter_khou.mm_letter_khou, mm.letter_kok_lonsum),
+            mmP.phoneme_kh: (mm.letter_khou, mm.letter_khou, mm.letter_kok_lonsum),
             mmP.phoneme_g: (mm.letter_gok, mm.letter_gok, mm.letter_kok_lonsum),
             mmP.phoneme_gh: (mm.letter_ghou, mm.letter_ghou, mm.letter_kok_lonsum),
             mmP.phoneme_ng: (
@@ -194,8 +256,8 @@ class P2M:
             ),
             mmP.phoneme_ui: (
                 f"{mm.letter_un}{mm.letter_i_lonsum}",
-                f"{mm.letter_unap}{mm.letter_i_lonsum}",
-                f"{mm.letter_unap}{mm.letter_i_lonsum}",
+                f"{mm.vowel_unap}{mm.letter_i_lonsum}",
+                f"{mm.vowel_unap}{mm.letter_i_lonsum}",
             ),
             mmP.phoneme_oi: (
                 f"{mm.letter_atiya}{mm.vowel_onap}{mm.letter_i_lonsum}",
@@ -220,10 +282,21 @@ class P2M:
             self.mm_end[key] = value[1]
             self.mm_end_2[key] = value[2]
 
+        # Same tables indexed by phoneme ID ("" for ID 0 and unmapped phonemes)
+        self.mm_begin_by_id: Tuple[str, ...] = tuple(
+            self.mm_begin.get(phoneme, "") for phoneme in mmP.phonemes
+        )
+        self.mm_end_by_id: Tuple[str, ...] = tuple(
+            self.mm_end.get(phoneme, "") for phoneme in mmP.phonemes
+        )
+        self.mm_end_2_by_id: Tuple[str, ...] = tuple(
+            self.mm_end_2.get(phoneme, "") for phoneme in mmP.phonemes
+        )
+
 
 class ARPA2MM:
     def get_map():
-        mm = MMPhoneme()
+        mm = MMPhoneme.shared()
         arpa = ARPABETPhoneme(num_letters=2)
         mm_to_arpabet: Dict[str | List[str]] = {
             mm.phoneme_k: [arpa.phoneme_K],
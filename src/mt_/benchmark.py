@@ -0,0 +1,356 @@
+"""Per-stage benchmarks of the transliteration pipeline.
+
+Usage:
+    mmt benchmark --corpus words.txt --output bench/
+    mmt benchmark --corpus words.txt --scale 1 8 --stages universal transliterate
+    mmt benchmark --compare bench/a.json bench/b.json
+    mmt benchmark --imports                   # import times, fails if too slow
+
+In a checkout, python benchmark.py runs it over the shipped corpora.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class StageResult(NamedTuple):
+    """Measurements of one stage over one corpus"""
+
+    stage: str
+    corpus: str
+    num_words: int
+    seconds: float
+    words_per_sec: float
+    p50_us: Optional[float]
+    p99_us: Optional[float]
+    peak_memory_kb: Optional[float]
+    error: Optional[str] = None
+
+
+# Stage -> function preparing its inputs from the words. The prepared inputs
+# are either (items, per_item_function) for per-word stages or
+# (None, whole_corpus_function) for batch stages.
+Prepared = Tuple[Optional[List[Any]], Callable]
+
+
+def _syllabified(words: List[str]) -> List[str]:
+    from . import syllabify
+
+    return [syllabify(word) for word in words]
+
+
+def prepare_universal(words: List[str]) -> Prepared:
+    from . import generate_universal_tag
+
+    return words, generate_universal_tag
+
+
+def prepare_universal_batch(words: List[str]) -> Prepared:
+    from . import generate_universal_tags
+
+    return None, lambda: generate_universal_tags(words)
+
+
+def prepare_contextual(words: List[str]) -> Prepared:
+    from . import generate_contextual_tag, generate_universal_tags
+
+    items = list(zip(words, generate_universal_tags(words)))
+    return items, lambda item: generate_contextual_tag(item[0], bytearray(item[1]))
+
+
+def prepare_shape(words: List[str]) -> Prepared:
+    from . import ShapeSyllabifier
+
+    return None, lambda: ShapeSyllabifier().tags_batch(words)
+
+
+def prepare_phonemes(words: List[str]) -> Prepared:
+    from . import split_syllable_phonemes
+
+    items = [word.split("/") for word in _syllabified(words)]
+    return items, lambda syllables: list(map(split_syllable_phonemes, syllables))
+
+
+def prepare_to_mm(words: List[str]) -> Prepared:
+    from . import to_mm
+
+    return _syllabified(words), to_mm
+
+
+def prepare_transliterate(words: List[str]) -> Prepared:
+    from . import MMTransliteration
+
+    mt = MMTransliteration()
+    return words, mt.transliterate
+
+
+def prepare_transliterate_batch(words: List[str]) -> Prepared:
+    from . import MMTransliteration
+
+    return None, lambda: MMTransliteration().transliterate_batch(words, jobs=1)
+
+
+def prepare_reverse(words: List[str]) -> Prepared:
+    from . import M2B, SyllableTransducer
+
+    return SyllableTransducer().transliterate_batch(words), M2B.shared().transliterate
+
+
+def prepare_lexicon(words: List[str]) -> Prepared:
+    from . import MMTransliteration, SyllableTransducer
+    from .lexicon import Lexicon
+
+    # Every word is in the lexicon, as when a corpus is its own labelled data
+    transliterate = SyllableTransducer().transliterate
+    lexicon = Lexicon.build((word, transliterate(word)) for word in words)
+    mt = MMTransliteration(lexicon=lexicon)
+    return words, mt.transliterate
+
+
+STAGES: Dict[str, Callable[[List[str]], Prepared]] = {
+    "universal": prepare_universal,
+    "universal_batch": prepare_universal_batch,
+    "contextual": prepare_contextual,
+    "shape": prepare_shape,
+    "phonemes": prepare_phonemes,
+    "to_mm": prepare_to_mm,
+    "transliterate": prepare_transliterate,
+    "transliterate_batch": prepare_transliterate_batch,
+    "reverse": prepare_reverse,
+    "lexicon": prepare_lexicon,
+}
+
+
+def percentile(sorted_values: List[int], fraction: float) -> float:
+    idx = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[idx]
+
+
+def run_stage(
+    stage: str, corpus: str, words: List[str], measure_memory: bool = True
+) -> StageResult:
+    """Time a stage over words; per-word stages also get latency percentiles."""
+    try:
+        items, function = STAGES[stage](words)
+        peak_memory_kb = None
+        if items is None:
+            start = time.perf_counter()
+            function()
+            seconds = time.perf_counter() - start
+            p50_us = p99_us = None
+            if measure_memory:
+                tracemalloc.start()
+                function()
+                peak_memory_kb = tracemalloc.get_traced_memory()[1] / 1024
+                tracemalloc.stop()
+        else:
+            clock = time.perf_counter_ns
+            latencies = []
+            start = time.perf_counter()
+            for item in items:
+                begin = clock()
+                function(item)
+                latencies.append(clock() - begin)
+            seconds = time.perf_counter() - start
+            latencies.sort()
+            p50_us = percentile(latencies, 0.50) / 1000 if latencies else None
+            p99_us = percentile(latencies, 0.99) / 1000 if latencies else None
+            if measure_memory:
+                tracemalloc.start()
+                for item in items:
+                    function(item)
+                peak_memory_kb = tracemalloc.get_traced_memory()[1] / 1024
+                tracemalloc.stop()
+    except Exception as exc:
+        return StageResult(stage, corpus, len(words), 0, 0, None, None, None, repr(exc))
+    words_per_sec = len(words) / seconds if seconds else float("inf")
+    return StageResult(
+        stage,
+        corpus,
+        len(words),
+        seconds,
+        words_per_sec,
+        p50_us,
+        p99_us,
+        peak_memory_kb,
+    )
+
+
+def read_words(path: str | Path) -> List[str]:
+    """Words of a corpus (first column of tab separated files)."""
+    lines = Path(path).read_text(encoding="utf-8").split("\n")
+    return [line.split("\t")[0] for line in lines if line.strip()]
+
+
+def scale_corpus(words: List[str], scale: int, seed: int = 0) -> List[str]:
+    """Scale a corpus up: the original words followed by (scale - 1) copies of
+    synthetic words, each made by joining two random words of the corpus."""
+    rng = random.Random(seed)
+    scaled = list(words)
+    for _ in range(scale - 1):
+        scaled.extend(rng.choice(words) + rng.choice(words) for _ in words)
+    return scaled
+
+
+# Modules importing the transliterator must not load (they load on first use)
+HEAVY_MODULES = ["numpy", "tqdm", "matplotlib", "sqlite3", "concurrent.futures"]
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+
+def import_time(module: str, repeat: int = 5) -> Tuple[float, List[str]]:
+    """Best import time of a module over fresh interpreters, and the heavy
+    modules it loaded."""
+    best, loaded = float("inf"), []
+    for _ in range(repeat):
+        probe = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+        output = subprocess.run(
+            [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+        ).stdout
+        seconds, loaded = json.loads(output)
+        best = min(best, seconds)
+    return best, loaded
+
+
+def check_imports(modules: List[str], max_ms: float) -> bool:
+    """Print import times of modules; False if one is slower than max_ms or
+    loads a heavy module."""
+    ok = True
+    for module in modules:
+        seconds, loaded = import_time(module)
+        failed = seconds * 1000 > max_ms or bool(loaded)
+        ok &= not failed
+        heavy = f" loads {', '.join(loaded)}" if loaded else ""
+        status = "FAIL" if failed else "ok"
+        print(f"import {module:<20} {seconds * 1000:8.1f}ms{heavy} {status}")
+    return ok
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    corpora: List[str],
+    scales: List[int],
+    stages: List[str],
+    output_dir: str | Path | None = None,
+    measure_memory: bool = True,
+) -> List[StageResult]:
+    """Run the stages over every corpus and scale, print a table and, if an
+    output directory is given, save the results as JSON. Returns the results
+    (failed stages have an error)."""
+    results: List[StageResult] = []
+    for corpus_path in corpora:
+        words = read_words(corpus_path)
+        for scale in scales:
+            corpus = f"{Path(corpus_path).name}x{scale}"
+            scaled = scale_corpus(words, scale)
+            for stage in stages:
+                result = run_stage(stage, corpus, scaled, measure_memory)
+                results.append(result)
+                print_result(result)
+
+    if output_dir is None:
+        return results
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": [result._asdict() for result in results],
+    }
+    output_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Saved {output_path}")
+    return results
+
+
+def print_result(result: StageResult) -> None:
+    if result.error:
+        print(f"{result.stage:<20} {result.corpus:<24} ERROR {result.error}")
+        return
+    latency = (
+        f"p50={result.p50_us:8.1f}us p99={result.p99_us:8.1f}us"
+        if result.p50_us is not None
+        else " " * 29
+    )
+    memory = (
+        f"peak={result.peak_memory_kb:10.1f}KB"
+        if result.peak_memory_kb is not None
+        else ""
+    )
+    print(
+        f"{result.stage:<20} {result.corpus:<24} {result.words_per_sec:12.0f} words/s"
+        f" {latency} {memory}"
+    )
+
+
+def compare(baseline_path: str | Path, current_path: str | Path) -> None:
+    """Print the words/sec ratio of every stage between two result files."""
+    baseline, current = (
+        {
+            (result["stage"], result["corpus"]): result
+            for result in json.loads(Path(path).read_text(encoding="utf-8"))["results"]
+        }
+        for path in (baseline_path, current_path)
+    )
+    for key, result in current.items():
+        old = baseline.get(key)
+        if old is None or old["error"] or result["error"]:
+            continue
+        ratio = result["words_per_sec"] / old["words_per_sec"]
+        print(f"{key[0]:<20} {key[1]:<24} {ratio:6.2f}x")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument(
+        "--corpus", nargs="+", default=[], help="word lists (first column is used)"
+    )
+    parser.add_argument("--scale", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--output", help="directory of the JSON results (not saved)")
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    parser.add_argument("--imports", action="store_true")
+    parser.add_argument("--max-import-ms", type=float, default=50)
+    # Modules timed by --imports
+    parser.set_defaults(import_modules=[__package__])
+    return parser
+
+
+def main(args: argparse.Namespace) -> int:
+    if args.imports:
+        return int(not check_imports(args.import_modules, args.max_import_ms))
+    elif args.compare:
+        compare(*args.compare)
+    elif not args.corpus:
+        print("benchmark: give corpora with --corpus", file=sys.stderr)
+        return 2
+    else:
+        results = run(
+            args.corpus, args.scale, args.stages, args.output, not args.no_memory
+        )
+        return int(any(result.error for result in results))
+    return 0
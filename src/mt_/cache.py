@@ -0,0 +1,229 @@
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from ..lon_ import MMPhoneme
+from .b2m import B2P, P2M
+
+if TYPE_CHECKING:
+    from .lexicon import Lexicon
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a WordCache"""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class WordCache:
+    """Bounded LRU cache of transliterated words with hit-rate statistics."""
+
+    def __init__(self, maxsize: int = 1 << 16) -> None:
+        """
+        Args:
+            maxsize (int): Maximum number of words kept. 0 disables storing.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[str, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._data
+
+    def get(self, word: str) -> Optional[str]:
+        """Get the cached output of a word (None on a miss)."""
+        value = self._data.get(word)
+        if value is None:
+            self.misses += 1
+        else:
+            self._data.move_to_end(word)
+            self.hits += 1
+        return value
+
+    def put(self, word: str, value: str) -> None:
+        """Store the output of a word, evicting the least recently used one."""
+        if self.maxsize <= 0:
+            return
+        self._data[word] = value
+        self._data.move_to_end(word)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, word: str, compute: Callable[[str], str]) -> str:
+        """Get the cached output of a word, computing and storing it on a miss."""
+        value = self.get(word)
+        if value is None:
+            value = compute(word)
+            self.put(word, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all words and reset statistics."""
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._data)
+        )
+
+
+class PersistentCache:
+    """SQLite-backed transliteration cache that survives between processes.
+
+    Entries are keyed by word and rules version, so outputs computed with
+    other rule tables (or another lexicon) are never returned. Configurations
+    sharing a file keep their own entries side by side; prune removes those
+    of other versions. Writes are buffered (and read back from the buffer)
+    and committed in batches.
+    """
+
+    _SELECT_CHUNK = 500
+
+    def __init__(
+        self, path: str | Path, version: str, flush_every: int = 10000
+    ) -> None:
+        self.path = Path(path)
+        self.version = version
+        self.flush_every = flush_every
+        # (version, word) -> output of entries not written yet
+        self._pending: Dict[Tuple[str, str], str] = {}
+
+        import sqlite3
+
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS words ("
+            "version TEXT NOT NULL, word TEXT NOT NULL, output TEXT NOT NULL, "
+            "PRIMARY KEY (version, word)) WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def __enter__(self) -> "PersistentCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        self.flush()
+        (count,) = self.connection.execute(
+            "SELECT COUNT(*) FROM words WHERE version = ?", (self.version,)
+        ).fetchone()
+        return count
+
+    def get(self, word: str) -> Optional[str]:
+        """Get the stored output of a word (None if absent)."""
+        output = self._pending.get((self.version, word))
+        if output is not None:
+            return output
+        row = self.connection.execute(
+            "SELECT output FROM words WHERE version = ? AND word = ?",
+            (self.version, word),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def get_many(self, words: Iterable[str]) -> Dict[str, str]:
+        """Get the stored outputs of many words with few queries (and none
+        for words not written yet)."""
+        found: Dict[str, str] = {}
+        missing: List[str] = []
+        for word in words:
+            output = self._pending.get((self.version, word))
+            if output is None:
+                missing.append(word)
+            else:
+                found[word] = output
+        for start in range(0, len(missing), self._SELECT_CHUNK):
+            chunk = missing[start : start + self._SELECT_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                self.connection.execute(
+                    "SELECT word, output FROM words "
+                    f"WHERE version = ? AND word IN ({placeholders})",
+                    (self.version, *chunk),
+                )
+            )
+        return found
+
+    def put(self, word: str, output: str) -> None:
+        """Store the output of a word (written on the next flush)."""
+        self._pending[self.version, word] = output
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered entries in one transaction."""
+        if self._pending:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO words VALUES (?, ?, ?)",
+                [(*key, output) for key, output in self._pending.items()],
+            )
+            self.connection.commit()
+            self._pending.clear()
+
+    def prune(self, keep: Iterable[str] = ()) -> int:
+        """Delete the entries of every version but this one and those in keep.
+        Returns the number of entries deleted."""
+        self.flush()
+        versions = {self.version, *keep}
+        placeholders = ",".join("?" * len(versions))
+        deleted = self.connection.execute(
+            f"DELETE FROM words WHERE version NOT IN ({placeholders})",
+            tuple(versions),
+        ).rowcount
+        self.connection.commit()
+        return deleted
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+
+# Bump when outputs change without any rule table changing
+PIPELINE_VERSION = 3
+
+
+def rules_version(lexicon: Optional["Lexicon"] = None) -> str:
+    """Hash of the rule tables outputs depend on: B2P, P2M, phoneme features and
+    the universal tagging matrix, of PIPELINE_VERSION and of the exception
+    lexicon, if any."""
+    from . import get_pair_codes
+
+    b2p, p2m, mmP = B2P.shared(), P2M.shared(), MMPhoneme.shared()
+    digest = hashlib.sha256()
+    digest.update(f"pipeline={PIPELINE_VERSION}".encode("utf-8"))
+    for table in (b2p.charmap, p2m.mm_begin, p2m.mm_end, p2m.mm_end_2):
+        digest.update(repr(sorted(table.items())).encode("utf-8"))
+    digest.update(repr(sorted(mmP.feats_consonant.items())).encode("utf-8"))
+    digest.update(get_pair_codes())
+    if lexicon is not None:
+        digest.update(f"lexicon={lexicon.fingerprint()}".encode("utf-8"))
+    return digest.hexdigest()[:16]
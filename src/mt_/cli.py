@@ -0,0 +1,281 @@
+"""Command-line interface of the Bengali to Meetei Mayek transliterator.
+
+Usage:
+    mmt transliterate words.txt -o output.txt
+    cat text.txt | mmt transliterate --jobs 0 > output.txt
+    mmt transliterate words.txt --format jsonl --cache cache.db
+    mmt tokens words.txt --format tsv
+    mmt evaluate labelled_data.txt --format jsonl
+    mmt benchmark --corpus words.txt --scale 1 --stages transliterate
+
+In a checkout, python main.py runs the same commands.
+
+Input files default to stdin ("-") and the output to stdout, so commands can
+be chained in shell pipelines. Input is read and written in blocks of
+--chunk-size lines, so memory does not grow with the corpus.
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+from . import MMTransliteration
+from .stream import BENGALI_WORD_PATTERN, iter_lines
+
+# Field names of the tsv/jsonl output of every command
+TRANSLITERATE_FIELDS = ("word", "output")
+TOKEN_FIELDS = ("word", "syllabified", "mixed", "complete", "unidentified", "tags")
+
+
+def iter_input_lines(paths: Sequence[str]) -> Iterator[str]:
+    """Lines of every input file in turn ("-" is stdin)."""
+    for path in paths:
+        if path == "-":
+            sys.stdin.reconfigure(encoding="utf-8")
+            yield from iter_lines(sys.stdin)
+        else:
+            yield from iter_lines(path)
+
+
+def open_output(path: str):
+    """Output file, or stdout for "-"."""
+    if path == "-":
+        sys.stdout.reconfigure(encoding="utf-8")
+        return nullcontext(sys.stdout)
+    return open(path, mode="w", encoding="utf-8", newline="")
+
+
+def iter_blocks(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    from .parallel import iter_chunked
+
+    return iter_chunked(lines, size)
+
+
+def write_rows(
+    output: TextIO, fmt: str, fields: Sequence[str], rows: Iterable[Sequence]
+) -> None:
+    if fmt == "jsonl":
+        output.writelines(
+            json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+    else:
+        output.writelines("\t".join(map(str, row)) + "\n" for row in rows)
+
+
+def batch_transliterator(
+    mt: MMTransliteration, executor, jobs: int
+) -> Callable[[List[str]], List[str]]:
+    """Transliterate a block of words, split evenly among the workers if any."""
+    if executor is None:
+        return lambda words: mt.transliterate_batch(words, jobs=1)
+    jobs = jobs or os.cpu_count() or 1
+
+    def transliterate(words: List[str]) -> List[str]:
+        chunk_size = max(1, -(-len(words) // jobs))
+        return mt.transliterate_batch(
+            words, jobs=jobs, chunk_size=chunk_size, executor=executor
+        )
+
+    return transliterate
+
+
+def transliterate_command(args: argparse.Namespace) -> int:
+    mt = MMTransliteration(cache_path=args.cache, lexicon=args.lexicon)
+    pool = mt.worker_pool(args.jobs or None) if args.jobs != 1 else nullcontext()
+    with mt, pool as executor, open_output(args.output) as output:
+        transliterate = batch_transliterator(mt, executor, args.jobs)
+        for block in iter_blocks(iter_input_lines(args.inputs), args.chunk_size):
+            if args.format == "text":
+                # Replace Bengali words in place, keeping everything else
+                words = [
+                    word
+                    for line in block
+                    for word in BENGALI_WORD_PATTERN.findall(line)
+                ]
+                outputs = dict(zip(words, transliterate(words)))
+                output.writelines(
+                    BENGALI_WORD_PATTERN.sub(lambda word: outputs[word.group()], line)
+                    + "\n"
+                    for line in block
+                )
+            else:
+                # One word per line
+                words = [line.strip() for line in block]
+                rows = zip(words, transliterate(words))
+                write_rows(output, args.format, TRANSLITERATE_FIELDS, rows)
+            output.flush()
+    return 0
+
+
+def tokens_command(args: argparse.Namespace) -> int:
+    from . import (
+        Tag,
+        check_markers,
+        generate_contextual_tag,
+        generate_universal_tags,
+        mix_markers,
+        use_markers,
+    )
+
+    num_words = num_completed = num_unidentified = num_tags = 0
+    with open_output(args.output) as output:
+        for block in iter_blocks(iter_input_lines(args.inputs), args.chunk_size):
+            words = [word for word in (line.strip() for line in block) if word]
+            if not words:
+                continue
+            # Same tags and fields as make_tokens, without its printed summary
+            rows = []
+            for word, char_markers in zip(words, generate_universal_tags(words)):
+                char_markers = generate_contextual_tag(word, char_markers)
+                rows.append(
+                    (
+                        word,
+                        use_markers(word, char_markers),
+                        mix_markers(word, char_markers),
+                        check_markers(char_markers),
+                        char_markers.count(Tag.NULL.code),
+                        len(char_markers),
+                    )
+                )
+            write_rows(output, args.format, TOKEN_FIELDS, rows)
+            output.flush()
+            num_words += len(rows)
+            for *_, complete, unidentified, tags in rows:
+                num_completed += complete
+                num_unidentified += unidentified
+                num_tags += tags
+    if num_words:
+        print(f"{num_completed}/{num_words} (Completed)", file=sys.stderr)
+        print(f"{num_unidentified}/{num_tags} (Marker Error)", file=sys.stderr)
+    return 0
+
+
+def evaluate_command(args: argparse.Namespace) -> int:
+    from .distance import compute_metrics
+    from .wordmap import labelled_wordmap
+
+    mt = MMTransliteration(cache_path=args.cache, lexicon=args.lexicon)
+    with mt, labelled_wordmap(args.labelled, args.wordmap) as target:
+        words = list(target.keys())
+        outputs = mt.transliterate_batch(
+            words, jobs=args.jobs or None, chunk_size=args.chunk_size
+        )
+        metrics = compute_metrics(
+            target, dict(zip(words, outputs)), jobs=args.jobs or None
+        )
+    with open_output(args.output) as output:
+        if args.format == "jsonl":
+            write_rows(output, args.format, tuple(metrics), [tuple(metrics.values())])
+        else:
+            write_rows(output, args.format, ("metric", "value"), metrics.items())
+    return 0
+
+
+def benchmark_command(args: argparse.Namespace) -> int:
+    from . import benchmark
+
+    return benchmark.main(args)
+
+
+def count_type(minimum: int) -> Callable[[str], int]:
+    """argparse type of integers of at least minimum."""
+
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}: {number}")
+        return number
+
+    return parse
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from . import benchmark
+
+    parser = argparse.ArgumentParser(prog="mmt", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Options shared by the commands reading words
+    io = argparse.ArgumentParser(add_help=False)
+    io.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    io.add_argument(
+        "--chunk-size",
+        type=count_type(1),
+        default=10000,
+        help="lines read and transliterated at a time (default: 10000)",
+    )
+    # Options of the commands transliterating
+    transliterator = argparse.ArgumentParser(add_help=False)
+    transliterator.add_argument(
+        "--jobs",
+        type=count_type(0),
+        default=1,
+        help="worker processes (0: one per CPU, 1: no workers; default: 1)",
+    )
+    transliterator.add_argument("--cache", help="SQLite file of a persistent cache")
+    transliterator.add_argument(
+        "--lexicon", help="exception lexicon: lexicon file or labelled .txt"
+    )
+
+    command = commands.add_parser(
+        "transliterate",
+        parents=[io, transliterator],
+        help="transliterate Bengali text or words",
+    )
+    command.add_argument("inputs", nargs="*", default=["-"], help="input files")
+    command.add_argument(
+        "--format",
+        choices=("text", "tsv", "jsonl"),
+        default="text",
+        help="text: replace Bengali words in running text (default); "
+        "tsv/jsonl: one word per input line, written with its output",
+    )
+    command.set_defaults(handler=transliterate_command)
+
+    command = commands.add_parser(
+        "tokens", parents=[io], help="syllabification tags of words"
+    )
+    command.add_argument("inputs", nargs="*", default=["-"], help="input files")
+    command.add_argument("--format", choices=("tsv", "jsonl"), default="tsv")
+    command.set_defaults(handler=tokens_command)
+
+    command = commands.add_parser(
+        "evaluate",
+        parents=[io, transliterator],
+        help="WMR and CER against labelled data",
+    )
+    command.add_argument("labelled", help="tab-separated word and target lines")
+    command.add_argument(
+        "--wordmap",
+        help="binary wordmap of the labelled data, built if missing or stale "
+        "(default: in ~/.cache/mm_transliteration or $MMT_CACHE_DIR)",
+    )
+    command.add_argument("--format", choices=("tsv", "jsonl"), default="tsv")
+    command.set_defaults(handler=evaluate_command)
+
+    command = commands.add_parser("benchmark", help="per-stage benchmarks")
+    benchmark.add_arguments(command)
+    command.set_defaults(handler=benchmark_command)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Output closed early (e.g. piped into head): stop without an error
+        # when the interpreter flushes stdout on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .parallel import iter_chunked
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Levenshtein distance using Myers' bit-parallel algorithm (Hyyrö's
+    formulation for global distance).
+
+    The longer string is encoded as bit vectors (one bit per character) and
+    the shorter one is scanned, so the loop runs min(len(a), len(b)) times.
+    """
+    if a == b:
+        return 0
+    pattern, text = (a, b) if len(a) >= len(b) else (b, a)
+    if not text:
+        return len(pattern)
+
+    # Match masks: bit i of peq[char] is set if pattern[i] == char
+    peq: Dict[str, int] = {}
+    for idx, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << idx)
+
+    mask = (1 << len(pattern)) - 1
+    last = 1 << (len(pattern) - 1)
+    pv, mv, score = mask, 0, len(pattern)
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+def _levenshtein_chunk(pairs: List[Tuple[str, str]]) -> List[int]:
+    return [levenshtein(a, b) for a, b in pairs]
+
+
+def levenshtein_batch(
+    pairs: Iterable[Tuple[str, str]], jobs: Optional[int] = 1, chunk_size: int = 5000
+) -> List[int]:
+    """Levenshtein distances of many pairs, optionally split across a process
+    pool (jobs=None uses every CPU). Distances are returned in input order."""
+    if jobs == 1:
+        return [levenshtein(a, b) for a, b in pairs]
+    distances: List[int] = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for chunk in executor.map(_levenshtein_chunk, iter_chunked(pairs, chunk_size)):
+            distances.extend(chunk)
+    return distances
+
+
+# CER -> normalize Levenshtein distance to [0, 1]
+# d(a,b) / max(len(a), len(b))
+def compute_metrics(
+    target_dict: Mapping[str, str], output_dict: Mapping[str, str], jobs: int | None = 1
+) -> Dict[str, float]:
+    """Word mismatch rate (WMR) and character error rate (CER), in percent, of
+    the outputs of every target word, with the counts they are computed from."""
+    # The counts do not depend on the order of the words
+    words = list(target_dict.keys())
+    pairs = [(target_dict.get(word, ""), output_dict.get(word, "")) for word in words]
+    num_word_mismatch = sum(target != output for target, output in pairs)
+    total_edit_distance = sum(levenshtein_batch(pairs, jobs=jobs))
+    total_chars = sum(max(len(target), len(output)) for target, output in pairs)
+    word_mismatch_rate = num_word_mismatch / len(words) * 100
+    cer = total_edit_distance / total_chars * 100
+    return {
+        "words": len(words),
+        "word_mismatches": num_word_mismatch,
+        "chars": total_chars,
+        "edit_distance": total_edit_distance,
+        "WMR": word_mismatch_rate,
+        "CER": cer,
+    }
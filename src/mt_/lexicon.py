@@ -0,0 +1,255 @@
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Lexicon file, little-endian: header (magic, version and the length of every
+# section), then the sections, each padded to 4 bytes. Integer sections are
+# arrays of the given type codes, the last two are UTF-8 text.
+LEXICON_MAGIC = b"MMLX"
+LEXICON_VERSION = 1
+_SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("first", "I"),
+    ("labels", "I"),
+    ("node_tails", "i"),
+    ("node_values", "i"),
+    ("tail_bounds", "I"),
+    ("value_bounds", "I"),
+    ("tail_text", "B"),
+    ("value_text", "B"),
+)
+_HEADER = struct.Struct(f"<4sI{len(_SECTIONS)}I")
+
+
+class Lexicon:
+    """Exception lexicon: words with a fixed output, looked up before the rules.
+
+    Words are stored in a trie laid out in flat arrays, with nodes numbered in
+    breadth-first order so the children of node n are the edges
+    first[n]:first[n + 1] (sorted code points in labels) and edge i leads to
+    node i + 1. Once a single word is left below a node, the rest of it is not
+    expanded into nodes but kept as a tail (UTF-8) in a tail store where a tail
+    ending another one is stored inside it. Outputs are deduplicated in a
+    value store. All sections are plain buffers, so a lexicon can be used
+    straight from a memory-mapped file or shared memory.
+    """
+
+    def __init__(self, sections: Dict[str, Iterable], path: Optional[Path] = None):
+        self.path = path
+        self.first = sections["first"]
+        self.labels = sections["labels"]
+        self.node_tails = sections["node_tails"]
+        self.node_values = sections["node_values"]
+        self.tail_bounds = sections["tail_bounds"]
+        self.value_bounds = sections["value_bounds"]
+        self.tail_text = sections["tail_text"]
+        self.value_text = sections["value_text"]
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def build(cls, pairs: Iterable[Tuple[str, str]]) -> "Lexicon":
+        """Build a lexicon from (word, output) pairs. A word given several
+        times keeps its last output."""
+        entries = sorted(dict(pairs).items())
+        words = [word for word, _ in entries]
+
+        # Value store: each distinct output once
+        value_ids: Dict[str, int] = {}
+        value_bounds = array("I", [0])
+        value_text = bytearray()
+        for _, output in entries:
+            if output not in value_ids:
+                value_ids[output] = len(value_ids)
+                value_text += output.encode("utf-8")
+                value_bounds.append(len(value_text))
+
+        # Trie, breadth first: (first word, end word, depth) of every node
+        first, labels = array("I", [0]), array("I")
+        node_tails, node_values = array("i"), array("i")
+        tails: List[str] = []
+        queue = deque([(0, len(words), 0)])
+        while queue:
+            lo, hi, depth = queue.popleft()
+            if hi - lo == 1:
+                node_tails.append(len(tails))
+                node_values.append(value_ids[entries[lo][1]])
+                tails.append(words[lo][depth:])
+            else:
+                node_tails.append(-1)
+                if lo < hi and len(words[lo]) == depth:
+                    node_values.append(value_ids[entries[lo][1]])
+                    lo += 1
+                else:
+                    node_values.append(-1)
+                while lo < hi:
+                    char = words[lo][depth]
+                    end = lo + 1
+                    while end < hi and words[end][depth] == char:
+                        end += 1
+                    labels.append(ord(char))
+                    queue.append((lo, end, depth + 1))
+                    lo = end
+            first.append(len(labels))
+
+        tail_bounds, tail_text = _build_tail_store(tails)
+        return cls(
+            {
+                "first": first,
+                "labels": labels,
+                "node_tails": node_tails,
+                "node_values": node_values,
+                "tail_bounds": tail_bounds,
+                "value_bounds": value_bounds,
+                "tail_text": bytes(tail_text),
+                "value_text": bytes(value_text),
+            }
+        )
+
+    @classmethod
+    def from_labelled(cls, path: str | Path) -> "Lexicon":
+        """Build a lexicon from tab-separated (word, output) lines."""
+        from .stream import iter_lines
+
+        return cls.build(
+            line.strip().split("\t") for line in iter_lines(path) if line.strip()
+        )
+
+    @classmethod
+    def from_buffer(cls, buffer, path: Optional[Path] = None) -> "Lexicon":
+        """Use a lexicon serialized by to_bytes in place (no copy)."""
+        view = memoryview(buffer)
+        magic, version, *lengths = _HEADER.unpack_from(view)
+        if magic != LEXICON_MAGIC or version != LEXICON_VERSION:
+            raise ValueError(f"not a version {LEXICON_VERSION} lexicon")
+        sections, offset = {}, _HEADER.size
+        for (name, typecode), length in zip(_SECTIONS, lengths):
+            size = length * array(typecode).itemsize
+            section = view[offset : offset + size]
+            if typecode == "B":
+                sections[name] = section
+            elif sys.byteorder == "little":
+                sections[name] = section.cast(typecode)
+            else:
+                sections[name] = array(typecode, section.tobytes())
+                sections[name].byteswap()
+            offset += _padded(size)
+        return cls(sections, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Lexicon":
+        """Memory-map a lexicon file written by save."""
+        path = Path(path)
+        with open(path, mode="rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        lexicon = cls.from_buffer(mapping, path)
+        lexicon._mmap = mapping
+        return lexicon
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    def to_bytes(self) -> bytes:
+        sections = [getattr(self, name) for name, _ in _SECTIONS]
+        chunks = [_HEADER.pack(LEXICON_MAGIC, LEXICON_VERSION, *map(len, sections))]
+        for (_, typecode), section in zip(_SECTIONS, sections):
+            if typecode != "B" and sys.byteorder != "little":
+                section = array(typecode, section)
+                section.byteswap()
+            data = bytes(section)
+            chunks.append(data + bytes(_padded(len(data)) - len(data)))
+        return b"".join(chunks)
+
+    def fingerprint(self) -> str:
+        """Hash of the contents, e.g. to version caches of outputs."""
+        return hashlib.sha256(self.to_bytes()).hexdigest()[:16]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the lexicon sections."""
+        return sum(memoryview(getattr(self, name)).nbytes for name, _ in _SECTIONS)
+
+    def __reduce__(self):
+        if self.path is not None:
+            return type(self).load, (self.path,)
+        return type(self).from_buffer, (self.to_bytes(),)
+
+    def __len__(self) -> int:
+        return sum(value >= 0 for value in self.node_values)
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    def get(self, word: str, default: Optional[str] = None) -> Optional[str]:
+        """Output of a word, or default if it is not in the lexicon."""
+        first, labels = self.first, self.labels
+        node_tails = self.node_tails
+        node, idx, end = 0, 0, len(word)
+        while True:
+            tail = node_tails[node]
+            if tail >= 0:
+                start, stop = self.tail_bounds[2 * tail], self.tail_bounds[2 * tail + 1]
+                if self.tail_text[start:stop] != word[idx:].encode("utf-8"):
+                    return default
+                return self.__value(self.node_values[node])
+            if idx == end:
+                value = self.node_values[node]
+                return default if value < 0 else self.__value(value)
+            lo, hi = first[node], first[node + 1]
+            code = ord(word[idx])
+            pos = bisect_left(labels, code, lo, hi)
+            if pos == hi or labels[pos] != code:
+                return default
+            node, idx = pos + 1, idx + 1
+
+    def close(self) -> None:
+        """Release the sections and unmap the file of a loaded lexicon."""
+        for name, _ in _SECTIONS:
+            section = getattr(self, name)
+            if isinstance(section, memoryview):
+                section.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __value(self, value: int) -> str:
+        start, stop = self.value_bounds[value], self.value_bounds[value + 1]
+        return bytes(self.value_text[start:stop]).decode("utf-8")
+
+
+def _build_tail_store(tails: List[str]) -> Tuple[array, bytearray]:
+    """Tail store: (start, end) of every tail in a UTF-8 text where a tail
+    that ends another one is stored inside it."""
+    encoded = {tail: tail.encode("utf-8") for tail in tails}
+    # Sorted by reversed text, descending, a tail comes right after the
+    # smallest tail it ends (if any)
+    order = sorted(encoded.values(), key=lambda data: data[::-1], reverse=True)
+    positions: Dict[bytes, Tuple[int, int]] = {}
+    text = bytearray()
+    previous, previous_end = None, 0
+    for data in order:
+        if previous is not None and previous.endswith(data):
+            positions[data] = (previous_end - len(data), previous_end)
+        else:
+            text += data
+            positions[data] = (len(text) - len(data), len(text))
+        previous, previous_end = data, positions[data][1]
+    bounds = array("I")
+    for tail in tails:
+        bounds.extend(positions[encoded[tail]])
+    return bounds, text
+
+
+def _padded(size: int) -> int:
+    return (size + 3) & ~3
+
+
+def open_lexicon(path: str | Path) -> Lexicon:
+    """Load a lexicon file, or build one from labelled data (.txt)."""
+    if Path(path).suffix == ".txt":
+        return Lexicon.from_labelled(path)
+    return Lexicon.load(path)
@@ -0,0 +1,98 @@
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import ContextManager, Dict, Iterator, List, Protocol
+
+
+class MetricsSink(Protocol):
+    """Receiver of pipeline metrics. Any object with these methods can be
+    attached to an Instrumentation."""
+
+    def timing(self, stage: str, seconds: float) -> None: ...
+
+    def count(self, name: str, value: int) -> None: ...
+
+    def observe(self, name: str, value: int) -> None: ...
+
+
+class Instrumentation:
+    """Dispatches pipeline metrics to the attached sinks.
+
+    Hot paths check `active` before doing any bookkeeping, so with no sink
+    attached instrumentation costs one attribute lookup per check.
+    """
+
+    _NULL_TIMER = nullcontext()
+
+    def __init__(self) -> None:
+        self.sinks: List[MetricsSink] = []
+        self.active: bool = False
+
+    def attach(self, sink: MetricsSink) -> MetricsSink:
+        self.sinks.append(sink)
+        self.active = True
+        return sink
+
+    def detach(self, sink: MetricsSink) -> None:
+        self.sinks.remove(sink)
+        self.active = bool(self.sinks)
+
+    def timer(self, stage: str) -> ContextManager:
+        """Context manager reporting the time spent in a stage."""
+        return self._timed(stage) if self.active else self._NULL_TIMER
+
+    @contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timing(stage, perf_counter() - start)
+
+    def timing(self, stage: str, seconds: float) -> None:
+        for sink in self.sinks:
+            sink.timing(stage, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        for sink in self.sinks:
+            sink.count(name, value)
+
+    def observe(self, name: str, value: int) -> None:
+        for sink in self.sinks:
+            sink.observe(name, value)
+
+
+class MemorySink:
+    """Sink aggregating metrics in memory: total time and calls per stage,
+    counters, and histograms of observed values."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = Counter()
+        self.calls: Dict[str, int] = Counter()
+        self.counters: Dict[str, int] = Counter()
+        self.histograms: Dict[str, Counter] = {}
+
+    def timing(self, stage: str, seconds: float) -> None:
+        self.seconds[stage] += seconds
+        self.calls[stage] += 1
+
+    def count(self, name: str, value: int) -> None:
+        self.counters[name] += value
+
+    def observe(self, name: str, value: int) -> None:
+        self.histograms.setdefault(name, Counter())[value] += 1
+
+    def summary(self) -> str:
+        lines = [
+            f"{stage}: {seconds:.4f}s ({self.calls[stage]} calls)"
+            for stage, seconds in self.seconds.items()
+        ]
+        lines += [f"{name}: {value}" for name, value in sorted(self.counters.items())]
+        for name, histogram in self.histograms.items():
+            bins = " ".join(f"{key}:{histogram[key]}" for key in sorted(histogram))
+            lines.append(f"{name}: {bins}")
+        return "\n".join(lines)
+
+
+# Process-wide instrumentation used by the pipeline
+instrumentation = Instrumentation()
@@ -0,0 +1,142 @@
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+if TYPE_CHECKING:
+    from .lexicon import Lexicon
+
+# Transliterator of the current worker process (set by _init_worker)
+_worker = None
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """Build the worker's transliterator and all shared tables once."""
+    global _worker
+    from . import B2P, P2M, MMTransliteration, get_pair_codes
+
+    B2P.shared()
+    P2M.shared()
+    get_pair_codes()
+    _worker = MMTransliteration(**options)
+
+
+def _transliterate_chunk(words: List[str]) -> List[str]:
+    return [_worker.transliterate(word, use_cache=True) for word in words]
+
+
+@contextmanager
+def shared_lexicon(lexicon: Optional["Lexicon"]) -> Iterator[Optional["Lexicon"]]:
+    """The lexicon in a form workers attach to instead of receiving a copy.
+
+    A lexicon loaded from a file is memory-mapped already, and workers reopen
+    the same file. Any other lexicon is written once to a temporary file for
+    the duration of the block, so all workers map the same pages of the page
+    cache and their memory does not grow with the lexicon.
+    """
+    if lexicon is None or lexicon.path is not None:
+        yield lexicon
+        return
+
+    import tempfile
+
+    from .lexicon import Lexicon
+
+    fd, path = tempfile.mkstemp(suffix=".lex")
+    try:
+        with os.fdopen(fd, mode="wb") as file:
+            file.write(lexicon.to_bytes())
+        mapped = Lexicon.load(path)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+    finally:
+        os.unlink(path)
+
+
+def iter_chunked(items: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Split an iterable into lists of at most chunk_size items."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def map_ordered(
+    executor: Executor,
+    function: Callable[[List[str]], List[str]],
+    chunks: Iterable[List[str]],
+    max_pending: int,
+) -> Iterator[List[str]]:
+    """Like executor.map, but submits at most max_pending chunks ahead of the
+    consumer so arbitrarily long inputs are not queued up front."""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(function, chunk))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+@contextmanager
+def worker_pool(
+    jobs: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+) -> Iterator[ProcessPoolExecutor]:
+    """Process pool of transliterating workers, to reuse across calls of
+    transliterate_parallel so workers are started once.
+
+    Args:
+        jobs (Optional[int]): number of worker processes (default: CPU count)
+        options (Optional[Dict[str, Any]]): MMTransliteration arguments of workers
+    """
+    jobs = jobs or os.cpu_count() or 1
+    options = dict(options or {})
+    with shared_lexicon(options.get("lexicon")) as lexicon:
+        if lexicon is not None:
+            options["lexicon"] = lexicon
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(options,)
+        ) as executor:
+            yield executor
+
+
+def transliterate_parallel(
+    words: Iterable[str],
+    jobs: Optional[int] = None,
+    chunk_size: int = 1000,
+    options: Optional[Dict[str, Any]] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[str]:
+    """Transliterate words in a process pool, yielding outputs in input order.
+
+    Args:
+        words (Iterable[str]): input words
+        jobs (Optional[int]): number of worker processes (default: CPU count)
+        chunk_size (int): number of words sent to a worker at a time
+        options (Optional[Dict[str, Any]]): MMTransliteration arguments of workers
+        executor (Optional[Executor]): pool from worker_pool to use instead of
+            starting one (options are then those of the pool)
+    """
+    if executor is None:
+        with worker_pool(jobs, options) as executor:
+            yield from transliterate_parallel(
+                words, jobs, chunk_size, executor=executor
+            )
+        return
+    jobs = jobs or os.cpu_count() or 1
+    for outputs in map_ordered(
+        executor, _transliterate_chunk, iter_chunked(words, chunk_size), 2 * jobs
+    ):
+        yield from outputs
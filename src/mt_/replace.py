@@ -0,0 +1,144 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+class CharmapReplacer:
+    """Rewrite text with a charmap in a single leftmost-longest pass.
+
+    Single-character keys that start no longer key go into a str.translate
+    table, the remaining keys are compiled into one regex alternation (longest
+    first) and the text between regex matches is translated. If a virama is
+    given, repeated viramas (in the source or produced by the replacements) are
+    collapsed to one as the output is written.
+    """
+
+    def __init__(self, charmap: Mapping[str, str], virama: Optional[str] = None):
+        self.virama = virama
+        self.repeated_virama = (
+            re.compile(f"{re.escape(virama)}{{2,}}") if virama else None
+        )
+        keys = sorted((key for key in charmap if key), key=len, reverse=True)
+        prefixes = {key[0] for key in keys if len(key) > 1}
+        self.table: Dict[int, str] = {
+            ord(key): charmap[key]
+            for key in keys
+            if len(key) == 1 and key not in prefixes
+        }
+        self.charmap: Dict[str, str] = {
+            key: self._collapse(charmap[key])
+            for key in keys
+            if len(key) > 1 or key in prefixes
+        }
+        self.pattern = (
+            re.compile("|".join(map(re.escape, self.charmap))) if self.charmap else None
+        )
+        self.max_key_len: int = max(map(len, self.charmap), default=1)
+
+    def rewrite(self, text: str) -> str:
+        """Rewrite the whole text."""
+        pieces: List[str] = []
+        self._rewrite(text, len(text), pieces, False)
+        return "".join(pieces)
+
+    def rewrite_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Rewrite text arriving in chunks, yielding rewritten chunks.
+
+        Only the last (max_key_len - 1) characters of a chunk are held back, so
+        keys spanning chunk boundaries are still matched.
+        """
+        carry, last_virama = "", False
+        for chunk in chunks:
+            buffer = carry + chunk
+            limit = len(buffer) - (self.max_key_len - 1)
+            if limit <= 0:
+                carry = buffer
+                continue
+            pieces: List[str] = []
+            consumed, last_virama = self._rewrite(buffer, limit, pieces, last_virama)
+            carry = buffer[consumed:]
+            if pieces:
+                yield "".join(pieces)
+        if carry:
+            pieces = []
+            self._rewrite(carry, len(carry), pieces, last_virama)
+            yield "".join(pieces)
+
+    def rewrite_file(
+        self,
+        input_path: str | Path,
+        output_path: str | Path,
+        chunk_size: int = 1 << 20,
+    ) -> None:
+        """Rewrite a file into another one, reading chunk_size characters at a time."""
+        with open(input_path, encoding="utf-8") as input_file, open(
+            output_path, mode="w", encoding="utf-8"
+        ) as output_file:
+            chunks = iter(lambda: input_file.read(chunk_size), "")
+            for rewritten in self.rewrite_stream(chunks):
+                output_file.write(rewritten)
+
+    def _rewrite(
+        self, text: str, limit: int, pieces: List[str], last_virama: bool
+    ) -> Tuple[int, bool]:
+        """Rewrite text up to limit (or up to the end of a key match starting
+        before limit) into pieces.
+
+        Returns:
+            Tuple[int, bool]: index up to which text was consumed and whether
+            the output written so far ends with a virama.
+        """
+        pos = 0
+        if self.pattern is not None:
+            for match in self.pattern.finditer(text, 0, len(text)):
+                start = match.start()
+                if start >= limit:
+                    break
+                if start > pos:
+                    gap = text[pos:start].translate(self.table)
+                    last_virama = self._emit(gap, pieces, last_virama)
+                value = self.charmap[match.group()]
+                last_virama = self._emit(value, pieces, last_virama)
+                pos = match.end()
+        if pos < limit:
+            gap = text[pos:limit].translate(self.table)
+            last_virama = self._emit(gap, pieces, last_virama)
+            pos = limit
+        return pos, last_virama
+
+    def _emit(self, piece: str, pieces: List[str], last_virama: bool) -> bool:
+        """Append an output piece, collapsing viramas. Returns whether the output
+        now ends with a virama."""
+        if self.virama is None:
+            pieces.append(piece)
+            return False
+        piece = self._collapse(piece)
+        if last_virama:
+            piece = piece.lstrip(self.virama)
+        if not piece:
+            return last_virama
+        pieces.append(piece)
+        return piece[-1] == self.virama
+
+    def _collapse(self, text: str) -> str:
+        """Replace repeated viramas with a single one."""
+        if self.repeated_virama is None or self.virama * 2 not in text:
+            return text
+        return self.repeated_virama.sub(self.virama, text)
+
+
+def compile_charmap(
+    charmap: Mapping[str, str], virama: Optional[str] = None
+) -> CharmapReplacer:
+    """Get the compiled replacer of a charmap, cached by the items of the
+    charmap, so a charmap changed in place is compiled again. The replacers of
+    the 32 most recently used charmaps are kept."""
+    return _compile_items(frozenset(charmap.items()), virama)
+
+
+@lru_cache(maxsize=32)
+def _compile_items(
+    items: FrozenSet[Tuple[str, str]], virama: Optional[str]
+) -> CharmapReplacer:
+    return CharmapReplacer(dict(items), virama)
@@ -0,0 +1,158 @@
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from ..lon_ import Bengali, CharClass, MeeteiMayek, MMPhoneme, Shared
+from .b2m import B2P, P2M
+from .cache import WordCache
+from .stream import MEETEI_MAYEK_WORD_PATTERN, Source, iter_chunks, stream_words
+from .trie import CharTrie
+
+# Reader states: after a vowel (or at the start), after a consonant letter and
+# after a lonsum letter (coda consonant)
+_VOWEL, _CONSONANT, _LONSUM = 0, 1, 2
+
+# Bengali spelling of a unit in each reader state, and the state after it
+Unit = Tuple[str, str, str, int]
+
+
+class M2B(Shared):
+    """Meetei Mayek to Bengali, built from the inverted P2M and B2P tables.
+
+    Meetei Mayek text is read left to right by longest match over the keys of
+    the P2M tables. Every key is spelt in Bengali from its phoneme, as a vowel
+    sign after a consonant and as an independent letter elsewhere. A lonsum
+    letter followed by a consonant forms a cluster with it (virama), and ngou
+    lonsum and nung are written as anusvara.
+    """
+
+    def __init__(self) -> None:
+        bn = Bengali.shared()
+        mm = MeeteiMayek.shared()
+        mmP = MMPhoneme.shared()
+        b2p, p2m = B2P.shared(), P2M.shared()
+
+        # Bengali letter of phonemes written with several letters (the most
+        # frequent one in data/words.txt)
+        preferred_consonant: Dict[str, str] = {
+            mmP.phoneme_t: bn.letter_ta,
+            mmP.phoneme_th: bn.letter_tha,
+            mmP.phoneme_d: bn.letter_da,
+            mmP.phoneme_dh: bn.letter_dha,
+            mmP.phoneme_n: bn.letter_na,
+            mmP.phoneme_j: bn.letter_yya,
+            mmP.phoneme_r: bn.letter_ra,
+            mmP.phoneme_s: bn.letter_sa,
+        }
+
+        # 1. Invert B2P: phoneme -> Bengali spelling by class of its first char
+        spellings: Dict[CharClass, Dict[str, str]] = {
+            char_class: {}
+            for char_class in (
+                CharClass.INDEPENDENT_CONSONANT,
+                CharClass.INDEPENDENT_VOWEL,
+                CharClass.DEPENDENT_VOWEL,
+                CharClass.DEPENDENT_CONSONANT,
+            )
+        }
+        for chars, phoneme in b2p.charmap.items():
+            char_class = CharClass(bn.get_class(chars[0]))
+            if char_class in spellings:
+                spellings[char_class].setdefault(phoneme, chars)
+        consonant = {
+            **spellings[CharClass.INDEPENDENT_CONSONANT],
+            **preferred_consonant,
+        }
+        independent = spellings[CharClass.INDEPENDENT_VOWEL]
+        dependent = spellings[CharClass.DEPENDENT_VOWEL]
+        virama, anusvara = bn.sign_virama, bn.sign_anusvara
+
+        # 2. Invert P2M: Meetei Mayek key -> unit. Begin letters take precedence
+        # over end letters spelt the same.
+        self.units: Dict[str, Unit] = {}
+        for phoneme, chars in p2m.mm_begin.items():
+            if phoneme in mmP.consonant_set:
+                letter = consonant[phoneme]
+                self.units[chars] = (letter, letter, virama + letter, _CONSONANT)
+            else:
+                letter = independent[phoneme]
+                self.units[chars] = (letter, letter, letter, _VOWEL)
+        for table in (p2m.mm_end, p2m.mm_end_2):
+            for phoneme, chars in table.items():
+                if not chars or chars in self.units:
+                    continue
+                if chars[0] in mm.lonsum_consonant_set:
+                    letter = consonant[phoneme]
+                    if phoneme == mmP.phoneme_ng:
+                        self.units[chars] = (anusvara, anusvara, anusvara, _VOWEL)
+                    else:
+                        self.units[chars] = (letter, letter, letter, _LONSUM)
+                else:
+                    sign = dependent.get(phoneme, consonant.get(phoneme))
+                    letter = independent.get(phoneme, sign)
+                    self.units[chars] = (letter, sign, sign, _VOWEL)
+
+        # 3. Letters write_mm adds around syllables, and digits
+        self.units[mm.vowel_nung] = (anusvara, anusvara, anusvara, _VOWEL)
+        self.units[mm.apun_iyek] = (virama, virama, virama, _VOWEL)
+        for offset in range(10):
+            digit = chr(ord(bn.digit_zero) + offset)
+            self.units[chr(ord(mm.digit_zero) + offset)] = (digit, digit, digit, _VOWEL)
+
+        self.tokenizer: CharTrie[Unit] = CharTrie(self.units)
+
+    def transliterate(self, text: str) -> str:
+        """Convert Meetei Mayek text to Bengali. Other characters are kept."""
+        children, values = self.tokenizer.children, self.tokenizer.values
+        output: List[str] = []
+        state = _VOWEL
+        idx, text_len = 0, len(text)
+        while idx < text_len:
+            node, end, unit = 0, idx, None
+            for pos in range(idx, text_len):
+                node = children[node].get(text[pos])
+                if node is None:
+                    break
+                if values[node] is not None:
+                    end, unit = pos + 1, values[node]
+            if unit is None:
+                output.append(text[idx])
+                state = _VOWEL
+                idx += 1
+            else:
+                output.append(unit[state])
+                state = unit[3]
+                idx = end
+        return "".join(output)
+
+    def transliterate_batch(self, words: List[str]) -> List[str]:
+        """Convert a list of words, each distinct word once."""
+        outputs: Dict[str, str] = {}
+        transliterate = self.transliterate
+        for word in words:
+            if word not in outputs:
+                outputs[word] = transliterate(word)
+        return [outputs[word] for word in words]
+
+    def transliterate_stream(
+        self, source: Source, chunk_size: int = 1 << 16, cache_size: int = 1 << 16
+    ) -> Iterator[str]:
+        """Convert a file path, file object or iterable of lines chunk by chunk.
+        Only Meetei Mayek words are replaced, and recently seen words are looked
+        up in an LRU cache of cache_size words."""
+        cache = WordCache(maxsize=cache_size)
+        transliterate = self.transliterate
+
+        def convert(word: str) -> str:
+            return cache.get_or_compute(word, transliterate)
+
+        yield from stream_words(
+            iter_chunks(source, chunk_size), convert, MEETEI_MAYEK_WORD_PATTERN
+        )
+
+    def transliterate_file(
+        self, input_path: str | Path, output_path: str | Path, chunk_size: int = 1 << 16
+    ) -> None:
+        """Convert a Meetei Mayek file into a Bengali one with bounded memory."""
+        with open(output_path, mode="w", encoding="utf-8", newline="") as file:
+            for chunk in self.transliterate_stream(input_path, chunk_size):
+                file.write(chunk)
@@ -0,0 +1,146 @@
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from ..lon_ import Bengali, MMPhoneme
+from .b2m import B2P
+from .cache import WordCache
+
+
+class ShapeInfo(NamedTuple):
+    """Statistics of a ShapeSyllabifier"""
+
+    hits: int
+    misses: int
+    shapes: int
+    char_classes: int
+    evictions: int
+    maxsize: int
+
+
+class ShapeSyllabifier:
+    """Syllabification tags (pass 1 and 2) computed once per word shape.
+
+    Pass 1 only looks at the pair tags of each character (its row and column
+    in the pair table) and pass 2 adds whether it is a virama or an independent
+    consonant. Around a virama, pass 2 also compares the phonemes on both
+    sides: their Sievers classes and whether they are equal (gemination).
+    Characters with equal features share a class, and the shape of a word is
+    the sequence of its character classes, using Sievers classes and gemination
+    flags only next to a virama. Words of the same shape get the same tags, so
+    they are computed for the first word of each shape only. Whether a
+    character is spelt (see B2P.spelt_pattern) is a feature too, so all words
+    of a shape are spelt alike.
+
+    The tags of at most maxsize shapes are kept, the least recently used
+    being dropped first, so memory stays bounded on corpora where shapes
+    rarely repeat (e.g. compounds).
+    """
+
+    def __init__(self, maxsize: int = 1 << 16) -> None:
+        """
+        Args:
+            maxsize (int): number of shapes whose tags are kept. 0 keeps none
+                (tags are computed for every word).
+        """
+        self._virama = Bengali.shared().sign_virama
+        # char -> (class id, class id with Sievers class, phoneme ID)
+        self._chars: Dict[str, Tuple[int, int, int]] = {}
+        # features -> class id
+        self._classes: Dict[Tuple, int] = {}
+        # char -> shape symbol of its class, filled in on first use
+        self._symbols = _SymbolTable(self.__add_char)
+        # shape -> tag codes
+        self._tags = WordCache(maxsize=maxsize)
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def info(self) -> ShapeInfo:
+        tags = self._tags.info()
+        return ShapeInfo(
+            tags.hits,
+            tags.misses,
+            tags.currsize,
+            len(self._classes),
+            tags.evictions,
+            tags.maxsize,
+        )
+
+    def shape(self, word: str) -> str:
+        """Shape of a word: one symbol (2 * class id + gemination flag) per
+        character.
+
+        The character after a virama (at idx) is compared with word[idx - 2]
+        as in the contextual pass, so for a leading virama the second character
+        is compared with the last one.
+        """
+        shape = word.translate(self._symbols)
+        end = len(word) - 1
+        idx = word.find(self._virama, 0, end)
+        if idx < 0:
+            return shape
+        chars = self._chars
+        symbols = list(map(ord, shape))
+        while idx >= 0:
+            after, before = chars[word[idx + 1]], chars[word[idx - 1]]
+            symbols[idx + 1] = 2 * after[1] + (after[2] == before[2])
+            symbols[idx - 1] = 2 * before[1] + (symbols[idx - 1] & 1)
+            idx = word.find(self._virama, idx + 1, end)
+        return "".join(map(chr, symbols))
+
+    def tags(self, word: str) -> bytearray:
+        """Tag codes of a word, as generate_contextual_tag(word,
+        generate_universal_tag(word)) returns them."""
+        shape = self.shape(word)
+        tags = self._tags.get(shape)
+        if tags is None:
+            tags = bytes(_direct_tags(word))
+            self._tags.put(shape, tags)
+        return bytearray(tags)
+
+    def tags_batch(self, words: Iterable[str]) -> List[bytearray]:
+        return [self.tags(word) for word in words]
+
+    def verify(self, words: Iterable[str]) -> List[str]:
+        """Words whose shape-based tags differ from the directly computed ones
+        (empty if the shapes capture everything the tagging passes use)."""
+        return [word for word in words if self.tags(word) != _direct_tags(word)]
+
+    def __add_char(self, char: str) -> str:
+        from . import _BLOCK_SIZE, _PAIR_STRIDE, get_pair_codes
+
+        bn = Bengali.shared()
+        pair_codes = get_pair_codes()
+        offset = ord(char) - bn.block_start
+        if not 0 <= offset < _BLOCK_SIZE:
+            offset = _BLOCK_SIZE
+        phoneme = B2P.shared().get_phoneme_id(char)
+        features = (
+            pair_codes[offset * _PAIR_STRIDE : (offset + 1) * _PAIR_STRIDE],
+            pair_codes[offset::_PAIR_STRIDE],
+            char == bn.sign_virama,
+            char in bn.independent_consonant_set,
+            B2P.shared().spelt_pattern.fullmatch(char) is not None,
+        )
+        sievers = MMPhoneme.shared().sievers_by_id[phoneme]
+        class_id = self._classes.setdefault(features, len(self._classes))
+        sievers_id = self._classes.setdefault((*features, sievers), len(self._classes))
+        self._chars[char] = (class_id, sievers_id, phoneme)
+        return chr(2 * class_id)
+
+
+class _SymbolTable(dict):
+    """str.translate table computing the entries of new characters."""
+
+    def __init__(self, add: Callable[[str], str]) -> None:
+        super().__init__()
+        self._add = add
+
+    def __missing__(self, code: int) -> str:
+        symbol = self[code] = self._add(chr(code))
+        return symbol
+
+
+def _direct_tags(word: str) -> bytearray:
+    from . import generate_contextual_tag, generate_universal_tag
+
+    return generate_contextual_tag(word, generate_universal_tag(word))
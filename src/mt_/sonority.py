@@ -0,0 +1,230 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+from ..lon_ import MMPhoneme
+from .b2m import B2P
+from .shape import ShapeSyllabifier
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Role of a phoneme in its syllable
+ONSET, NUCLEUS, CODA = 0, 1, 2
+
+# Sonority values are shifted by one in histograms, so that bin 0 counts
+# phonemes without a value (-1)
+_MAX_SONORITY = 11
+
+
+class CorpusSonority:
+    """Sonority profiles of every syllabified word of a corpus.
+
+    The phonemes of all syllables are stored in flat arrays: the sonority and
+    the role (ONSET, NUCLEUS or CODA) of every phoneme, the phoneme offsets of
+    the syllables and the syllable offsets of the words. Statistics are
+    computed with whole-array operations on them.
+    """
+
+    def __init__(
+        self,
+        scale: str,
+        values: "np.ndarray",
+        roles: "np.ndarray",
+        syllable_offsets: "np.ndarray",
+        word_offsets: "np.ndarray",
+    ) -> None:
+        self.scale = scale
+        self.values = values
+        self.roles = roles
+        self.syllable_offsets = syllable_offsets
+        self.word_offsets = word_offsets
+
+    @property
+    def num_words(self) -> int:
+        return len(self.word_offsets) - 1
+
+    @property
+    def num_syllables(self) -> int:
+        return len(self.syllable_offsets) - 1
+
+    def word_profile(self, idx: int) -> "np.ndarray":
+        """Sonority values of the phonemes of a word."""
+        start = self.syllable_offsets[self.word_offsets[idx]]
+        end = self.syllable_offsets[self.word_offsets[idx + 1]]
+        return self.values[start:end]
+
+    def violations(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Sonority sequencing violations per syllable: pairs of adjacent onset
+        phonemes not rising in sonority and pairs of adjacent coda phonemes not
+        falling in sonority."""
+        import numpy as np
+
+        values, roles = self.values.astype(np.int16), self.roles
+        syllables = self.__syllable_ids()
+        same = (syllables[:-1] == syllables[1:]) & (roles[:-1] == roles[1:])
+        onset = same & (roles[:-1] == ONSET) & (values[:-1] >= values[1:])
+        coda = same & (roles[:-1] == CODA) & (values[:-1] <= values[1:])
+        counts = np.bincount(syllables[:-1][onset], minlength=self.num_syllables)
+        return counts, np.bincount(syllables[:-1][coda], minlength=self.num_syllables)
+
+    def peaks(self) -> "np.ndarray":
+        """Number of sonority peaks per word. A peak is a phoneme louder than
+        the one before it and at least as loud as the one after it, within the
+        word."""
+        import numpy as np
+
+        values = self.values.astype(np.int16)
+        starts = self.syllable_offsets[self.word_offsets]
+        # Treat word edges as silence
+        words = np.repeat(np.arange(self.num_words), np.diff(starts))
+        left = np.full(len(values), -2, dtype=np.int16)
+        right = np.full(len(values), -2, dtype=np.int16)
+        inner = words[1:] == words[:-1]
+        left[1:][inner] = values[:-1][inner]
+        right[:-1][inner] = values[1:][inner]
+        is_peak = (values > left) & (values >= right)
+        return np.bincount(words[is_peak], minlength=self.num_words)
+
+    def distributions(self) -> Dict[str, "np.ndarray"]:
+        """Histograms of the corpus: sonority of onset, nucleus and coda
+        phonemes (bin = value + 1), onset and coda lengths, peaks per word and
+        peaks minus syllables per word (bin = difference + number of bins // 2)."""
+        import numpy as np
+
+        bins = _MAX_SONORITY + 2
+        shifted = self.values.astype(np.int16) + 1
+        syllables = self.__syllable_ids()
+        histograms = {
+            f"{name}_sonority": np.bincount(shifted[self.roles == role], minlength=bins)
+            for name, role in (("onset", ONSET), ("nucleus", NUCLEUS), ("coda", CODA))
+        }
+        for name, role in (("onset", ONSET), ("coda", CODA)):
+            lengths = np.bincount(
+                syllables[self.roles == role], minlength=self.num_syllables
+            )
+            histograms[f"{name}_length"] = np.bincount(lengths)
+        peaks = self.peaks()
+        histograms["peaks"] = np.bincount(peaks)
+        difference = peaks - np.diff(self.word_offsets)
+        center = int(np.abs(difference).max(initial=0))
+        histograms["peaks_minus_syllables"] = np.bincount(
+            difference + center, minlength=2 * center + 1
+        )
+        return histograms
+
+    def summary(self) -> Dict[str, "np.ndarray"]:
+        """Distributions and histograms of onset and coda violations per
+        syllable."""
+        import numpy as np
+
+        summary = self.distributions()
+        onset, coda = self.violations()
+        summary["onset_violations"] = np.bincount(onset)
+        summary["coda_violations"] = np.bincount(coda)
+        return summary
+
+    def save_npz(self, path: str | Path, profiles: bool = True) -> None:
+        """Save the summary, and the profiles themselves unless profiles is
+        False, as a compressed .npz archive (see load)."""
+        import numpy as np
+
+        arrays = self.summary()
+        if profiles:
+            arrays.update(
+                values=self.values,
+                roles=self.roles,
+                syllable_offsets=self.syllable_offsets,
+                word_offsets=self.word_offsets,
+            )
+        np.savez_compressed(path, scale=np.array(self.scale), **arrays)
+
+    def save_csv(self, path: str | Path) -> None:
+        """Save the summary as rows of (statistic, bin, count)."""
+        import csv
+
+        with open(path, mode="w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(("statistic", "bin", "count"))
+            for name, histogram in self.summary().items():
+                writer.writerows(
+                    (name, idx, int(count)) for idx, count in enumerate(histogram)
+                )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CorpusSonority":
+        """Load profiles saved by save_npz."""
+        import numpy as np
+
+        with np.load(path) as data:
+            return cls(
+                str(data["scale"]),
+                data["values"],
+                data["roles"],
+                data["syllable_offsets"],
+                data["word_offsets"],
+            )
+
+    def __syllable_ids(self) -> "np.ndarray":
+        import numpy as np
+
+        return np.repeat(np.arange(self.num_syllables), np.diff(self.syllable_offsets))
+
+
+def corpus_sonority(words: Iterable[str], scale: str = "sievers") -> CorpusSonority:
+    """Syllabify and phonemize the spelt runs of every word (as the transducer
+    does, see B2P.spelt_pattern) and look up the sonority of all phonemes at
+    once. Syllables without phonemes (e.g. a lone virama) are left out.
+    scale is a column of MMPhoneme.FEATURES, "sievers" or "parker"."""
+    import numpy as np
+
+    from . import split_phoneme_ids, syllable_cuts
+
+    mmP = MMPhoneme.shared()
+    b2p = B2P.shared()
+    shapes = ShapeSyllabifier()
+    # syllable -> (phoneme IDs, roles)
+    syllable_table: Dict[str, Tuple[bytes, bytes]] = {}
+
+    phonemes: List[bytes] = []
+    roles: List[bytes] = []
+    syllable_lengths: List[int] = []
+    word_lengths: List[int] = []
+    for word in words:
+        num_syllables = 0
+        for match in b2p.spelt_pattern.finditer(b2p.compose(word)):
+            run = match.group()
+            cuts = [0, *syllable_cuts(shapes.tags(run)), len(run)]
+            for start, end in zip(cuts[:-1], cuts[1:]):
+                syllable = run[start:end]
+                entry = syllable_table.get(syllable)
+                if entry is None:
+                    onset, nucleus, coda = split_phoneme_ids(
+                        b2p.to_phoneme_ids(syllable)
+                    )
+                    entry = syllable_table[syllable] = (
+                        bytes(onset + nucleus + coda),
+                        bytes(
+                            [ONSET] * len(onset)
+                            + [NUCLEUS] * len(nucleus)
+                            + [CODA] * len(coda)
+                        ),
+                    )
+                if not entry[0]:
+                    continue
+                phonemes.append(entry[0])
+                roles.append(entry[1])
+                syllable_lengths.append(len(entry[0]))
+                num_syllables += 1
+        word_lengths.append(num_syllables)
+
+    syllable_offsets = np.zeros(len(syllable_lengths) + 1, dtype=np.int64)
+    np.cumsum(syllable_lengths, out=syllable_offsets[1:])
+    word_offsets = np.zeros(len(word_lengths) + 1, dtype=np.int64)
+    np.cumsum(word_lengths, out=word_offsets[1:])
+    return CorpusSonority(
+        scale,
+        mmP.sonority_profile(b"".join(phonemes), scale),
+        np.frombuffer(b"".join(roles), dtype=np.uint8),
+        syllable_offsets,
+        word_offsets,
+    )
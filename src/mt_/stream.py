@@ -0,0 +1,65 @@
+import re
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TextIO, Union
+
+# Runs of Bengali block characters (with zero-width joiners) are words
+BENGALI_WORD_PATTERN = re.compile("[\u0980-\u09ff\u200c\u200d]+")
+# Runs of Meetei Mayek block characters are words
+MEETEI_MAYEK_WORD_PATTERN = re.compile("[\uabc0-\uabff]+")
+
+Source = Union[str, Path, TextIO, Iterable[str]]
+
+
+def iter_chunks(source: Source, chunk_size: int = 1 << 16) -> Iterator[str]:
+    """Iterate over the text of a source in bounded chunks.
+
+    Args:
+        source (Source): file path (str or Path), text file object or an
+            iterable of strings (e.g. lines)
+        chunk_size (int): number of characters read at a time from files
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, encoding="utf-8", newline="") as file:
+            yield from iter(lambda: file.read(chunk_size), "")
+    elif hasattr(source, "read"):
+        yield from iter(lambda: source.read(chunk_size), "")
+    else:
+        yield from source
+
+
+def iter_lines(source: Source) -> Iterator[str]:
+    """Iterate over the lines of a source without their line feeds.
+
+    Args:
+        source (Source): file path (str or Path), text file object or an
+            iterable of lines
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, encoding="utf-8", newline="") as file:
+            yield from (line.removesuffix("\n") for line in file)
+    else:
+        yield from (line.removesuffix("\n") for line in source)
+
+
+def stream_words(
+    chunks: Iterable[str],
+    convert: Callable[[str], str],
+    word_pattern: re.Pattern = BENGALI_WORD_PATTERN,
+) -> Iterator[str]:
+    """Convert every word of a chunked text, keeping everything between words
+    (whitespace, punctuation, line breaks) as it is.
+
+    A word at the end of a chunk is held back until the next chunk, so words
+    split across chunks are converted whole.
+    """
+    trailing_word = re.compile(f"(?:{word_pattern.pattern})\\Z")
+    carry = ""
+    for chunk in chunks:
+        buffer = carry + chunk
+        match = trailing_word.search(buffer)
+        cut = match.start() if match else len(buffer)
+        carry = buffer[cut:]
+        if cut:
+            yield word_pattern.sub(lambda word: convert(word.group()), buffer[:cut])
+    if carry:
+        yield word_pattern.sub(lambda word: convert(word.group()), carry)
@@ -0,0 +1,150 @@
+from typing import Callable, Iterable, List, NamedTuple, Tuple
+
+from ..lon_ import Bengali, MeeteiMayek
+from .b2m import B2P
+from .cache import WordCache
+from .shape import ShapeSyllabifier
+
+
+class TransducerInfo(NamedTuple):
+    """Number of entries materialized in a SyllableTransducer"""
+
+    shapes: int
+    syllables: int
+
+
+class SyllableTransducer:
+    """Bengali to Meetei Mayek transducer equivalent to
+    spell(phonemize(syllabify(word))).
+
+    The rule tables are compiled lazily into two tables: word shape -> syllable
+    spans (the boundaries of the tagging passes, see ShapeSyllabifier) and
+    syllable -> Meetei Mayek output (B2P, nucleus split and P2M). An entry is
+    built the first time a shape or syllable is seen, after which a word is
+    transliterated in one pass over its syllables without intermediate
+    strings or phoneme lists.
+
+    Only runs of spelt characters (see B2P.spelt_pattern) are spelt, after
+    base letter and nukta sequences are composed (see B2P.compose). Other
+    characters, such as punctuation, are kept as they are, and Bengali digits
+    are written as Meetei Mayek digits.
+
+    Both tables hold at most maxsize entries, so memory stays bounded on
+    corpora of rarely repeating words. Shapes are evicted least recently used
+    first. Syllables are far fewer and mostly seen early, so once the syllable
+    table is full, new syllables are spelt without being stored.
+    """
+
+    def __init__(self, maxsize: int = 1 << 16) -> None:
+        """
+        Args:
+            maxsize (int): number of shapes and of syllables kept. 0 keeps none
+                (every word is syllabified and spelt from the rules).
+        """
+        bn, mm = Bengali.shared(), MeeteiMayek.shared()
+        self.maxsize = maxsize
+        # Tags are only computed for shapes missing from the span table
+        self.shapes = ShapeSyllabifier(maxsize=0)
+        b2p = B2P.shared()
+        self._spelt = b2p.spelt_pattern
+        self._nukta, self._compose = b2p.nukta, b2p.compose
+        self._digits = {
+            ord(bn.digit_zero) + offset: chr(ord(mm.digit_zero) + offset)
+            for offset in range(10)
+        }
+        # shape -> (start, end) of every syllable, () for words with
+        # characters that are not spelt
+        self._spans = WordCache(maxsize=maxsize)
+        # syllable -> Meetei Mayek
+        self._outputs = _OutputTable(_spell_syllable, maxsize)
+
+    def info(self) -> TransducerInfo:
+        return TransducerInfo(len(self._spans), len(self._outputs))
+
+    def clear(self) -> None:
+        """Drop the compiled shapes and syllables."""
+        self._spans.clear()
+        self._outputs.clear()
+
+    def transliterate(self, word: str) -> str:
+        if not word:
+            return ""
+        if self._nukta in word:
+            word = self._compose(word)
+        shape = self.shapes.shape(word)
+        spans = self._spans.get(shape)
+        if spans is None:
+            spans = self.__add_shape(word, shape)
+        if not spans:
+            # Characters without a phoneme are part of the shape
+            return self.__pass_through(word, self.transliterate)
+        outputs = self._outputs
+        return "".join([outputs[word[start:end]] for start, end in spans])
+
+    def transliterate_batch(self, words: Iterable[str]) -> List[str]:
+        transliterate = self.transliterate
+        return [transliterate(word) for word in words]
+
+    def verify(self, words: Iterable[str]) -> List[str]:
+        """Words transliterated differently than by the step-by-step path
+        (syllabify, phonemize, spell)."""
+        from . import phonemize, spell, syllabify
+
+        # The step path delimits syllables inside the text, so use a delimiter
+        # that does not occur in words (e.g. "/" does in the corpus)
+        delimiter = "\0"
+
+        def step(run: str) -> str:
+            return spell(phonemize(syllabify(run, delimiter), delimiter), delimiter)
+
+        return [
+            word
+            for word in words
+            if self.transliterate(word)
+            != self.__pass_through(self._compose(word), step)
+        ]
+
+    def __pass_through(self, word: str, spell: Callable[[str], str]) -> str:
+        """Spell the runs of spelt characters of a word and keep the characters
+        between them (digits as Meetei Mayek digits)."""
+        pieces: List[str] = []
+        pos = 0
+        for match in self._spelt.finditer(word):
+            pieces.append(word[pos : match.start()].translate(self._digits))
+            pieces.append(spell(match.group()))
+            pos = match.end()
+        pieces.append(word[pos:].translate(self._digits))
+        return "".join(pieces)
+
+    def __add_shape(self, word: str, shape: str) -> Tuple[Tuple[int, int], ...]:
+        from . import syllable_cuts
+
+        if self._spelt.fullmatch(word):
+            cuts = [0, *syllable_cuts(self.shapes.tags(word)), len(word)]
+            spans = tuple(zip(cuts[:-1], cuts[1:]))
+        else:
+            spans = ()
+        self._spans.put(shape, spans)
+        return spans
+
+
+class _OutputTable(dict):
+    """Table computing the outputs of new keys on first lookup, storing at
+    most maxsize of them."""
+
+    def __init__(self, compute: Callable[[str], str], maxsize: int) -> None:
+        super().__init__()
+        self._compute = compute
+        self.maxsize = maxsize
+
+    def __missing__(self, key: str) -> str:
+        value = self._compute(key)
+        if len(self) < self.maxsize:
+            self[key] = value
+        return value
+
+
+def _spell_syllable(syllable: str) -> str:
+    from . import B2P, split_phoneme_ids, write_mm_ids
+
+    return write_mm_ids(*split_phoneme_ids(B2P.shared().to_phoneme_ids(syllable)))
@@ -0,0 +1,77 @@
+from typing import Dict, Generic, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class CharTrie(Generic[V]):
+    """Longest-match trie over the keys of a charmap, compiled once.
+
+    Nodes are stored as a list of child tables (char -> node index) and a
+    parallel list of values (None for nodes that do not end a key).
+    """
+
+    def __init__(self, charmap: Mapping[str, V]) -> None:
+        self.children: List[Dict[str, int]] = [{}]
+        self.values: List[Optional[V]] = [None]
+        self.max_key_len: int = 0
+        for key, value in charmap.items():
+            node = 0
+            for char in key:
+                child = self.children[node].get(char)
+                if child is None:
+                    child = len(self.children)
+                    self.children[node][char] = child
+                    self.children.append({})
+                    self.values.append(None)
+                node = child
+            self.values[node] = value
+            self.max_key_len = max(self.max_key_len, len(key))
+
+    def match(self, text: str, start: int = 0) -> Tuple[int, Optional[V]]:
+        """Find the longest key starting at `start`.
+
+        Returns:
+            Tuple[int, Optional[V]]: end index and value of the match, or
+            (start, None) if no key starts there.
+        """
+        children, values = self.children, self.values
+        node, end, value = 0, start, None
+        for pos in range(start, len(text)):
+            node = children[node].get(text[pos])
+            if node is None:
+                break
+            if values[node] is not None:
+                end, value = pos + 1, values[node]
+        return end, value
+
+    def tokenize(self, text: str) -> Iterator[Tuple[int, int, V]]:
+        """Scan text left to right and yield (start, end, value) of every longest
+        match. Characters that start no key are skipped."""
+        idx, text_len = 0, len(text)
+        while idx < text_len:
+            end, value = self.match(text, idx)
+            if value is None:
+                idx += 1
+            else:
+                yield idx, end, value
+                idx = end
+
+    def translate(self, text: str) -> List[V]:
+        """Values of all longest matches in text, in one left-to-right pass."""
+        children, values = self.children, self.values
+        output: List[V] = []
+        idx, text_len = 0, len(text)
+        while idx < text_len:
+            node, end, value = 0, idx, None
+            for pos in range(idx, text_len):
+                node = children[node].get(text[pos])
+                if node is None:
+                    break
+                if values[node] is not None:
+                    end, value = pos + 1, values[node]
+            if value is None:
+                idx += 1
+            else:
+                output.append(value)
+                idx = end
+        return output
@@ -0,0 +1,327 @@
+import csv
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+# Keys of the JSONL wordmap: Bengali word and Meetei Mayek output, as in the
+# tsv/jsonl output of the CLI
+WORDMAP_FIELDS = ("word", "output")
+# Header of the CSV wordmap, kept from the original CSV files for their readers
+CSV_FIELDS = ("s550", "bn")
+TEXT_FORMATS = ("txt", "jsonl", "csv")
+
+# Binary wordmap (.bin), little-endian:
+#   header: magic, format version (u32), number of entries (u64) and offset of
+#           the index (u64)
+#   records sorted by the UTF-8 bytes of the source word, one per source word:
+#           source length (u32), output length (u32), UTF-8 source and output
+#   index: offset of every record from the start of the file (u64)
+WORDMAP_MAGIC = b"MMWM"
+WORDMAP_VERSION = 1
+WORDMAP_HEADER = struct.Struct("<4sIQQ")
+WORDMAP_RECORD = struct.Struct("<II")
+WORDMAP_OFFSET = struct.Struct("<Q")
+
+Record = Tuple[bytes, bytes]
+
+
+class WordmapWriter:
+    """Writes (source, output) pairs to txt, JSONL and CSV wordmaps in a single
+    pass, and to a sorted binary wordmap with an offset index on close.
+
+    Text formats keep every pair in input order. The binary wordmap keeps one
+    record per source word (the last output written for it, as a dict would)
+    and is built by external merge sort: pairs are buffered, sorted and spilled
+    to temporary run files of run_size pairs, which are merged on close. Memory
+    use is bounded by run_size whatever the number of pairs.
+    """
+
+    def __init__(
+        self,
+        wordmap_path: str | Path,
+        formats: Iterable[str] = TEXT_FORMATS,
+        binary: bool = True,
+        run_size: int = 1 << 18,
+    ) -> None:
+        self.path = Path(wordmap_path)
+        self.run_size = run_size
+        self.count = 0
+        self._files = {
+            fmt: open(
+                self.path.with_suffix(f".{fmt}"),
+                mode="w",
+                encoding="utf-8",
+                newline="" if fmt == "csv" else None,
+            )
+            for fmt in formats
+        }
+        self._txt = self._files.get("txt")
+        self._jsonl = self._files.get("jsonl")
+        self._csv = None
+        if "csv" in self._files:
+            self._csv = csv.writer(self._files["csv"])
+            self._csv.writerow(CSV_FIELDS)
+        self._binary = binary
+        self._buffer: List[Record] = []
+        self._runs: List[BinaryIO] = []
+
+    def __enter__(self) -> "WordmapWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close(abort=exc_type is not None)
+
+    def write(self, source: str, output: str) -> None:
+        if self._txt:
+            self._txt.write(f"{source}\t{output}\n")
+        if self._jsonl:
+            self._jsonl.write(
+                json.dumps(
+                    dict(zip(WORDMAP_FIELDS, (source, output))), ensure_ascii=False
+                )
+            )
+            self._jsonl.write("\n")
+        if self._csv:
+            self._csv.writerow((source, output))
+        if self._binary:
+            self._buffer.append((source.encode("utf-8"), output.encode("utf-8")))
+            if len(self._buffer) >= self.run_size:
+                self.__spill()
+        self.count += 1
+
+    def write_all(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Write every pair. Returns the number of pairs written so far."""
+        write = self.write
+        for source, output in pairs:
+            write(source, output)
+        return self.count
+
+    def close(self, abort: bool = False) -> None:
+        """Close the text wordmaps and, unless aborted, write the binary one."""
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+        if self._binary and not abort:
+            self.__spill()
+            _write_binary(self.path.with_suffix(".bin"), self._runs)
+        for run in self._runs:
+            run.close()
+        self._runs.clear()
+        self._buffer.clear()
+        self._binary = False
+
+    def __spill(self) -> None:
+        """Sort the buffered pairs into a new run file."""
+        if not self._buffer:
+            return
+        self._buffer.sort(key=itemgetter(0))
+        run = tempfile.TemporaryFile()
+        for record in self._buffer:
+            _write_record(run, record)
+        run.seek(0)
+        self._runs.append(run)
+        self._buffer.clear()
+
+
+def write_wordmap(
+    pairs: Iterable[Tuple[str, str]],
+    wordmap_path: str | Path,
+    formats: Iterable[str] = TEXT_FORMATS,
+    binary: bool = True,
+    run_size: int = 1 << 18,
+) -> int:
+    """Write a wordmap with WordmapWriter. Returns the number of pairs."""
+    with WordmapWriter(wordmap_path, formats, binary, run_size) as writer:
+        return writer.write_all(pairs)
+
+
+def _write_record(file: BinaryIO, record: Record) -> int:
+    source, output = record
+    file.write(WORDMAP_RECORD.pack(len(source), len(output)))
+    file.write(source)
+    file.write(output)
+    return WORDMAP_RECORD.size + len(source) + len(output)
+
+
+def _read_records(file: BinaryIO) -> Iterator[Record]:
+    read = file.read
+    while header := read(WORDMAP_RECORD.size):
+        source_len, output_len = WORDMAP_RECORD.unpack(header)
+        yield read(source_len), read(output_len)
+
+
+def _unique_last(records: Iterable[Record]) -> Iterator[Record]:
+    """Last record of each run of records with the same source."""
+    previous = None
+    for record in records:
+        if previous is not None and record[0] != previous[0]:
+            yield previous
+        previous = record
+    if previous is not None:
+        yield previous
+
+
+def _write_binary(path: Path, runs: List[BinaryIO]) -> None:
+    # heapq.merge is stable, so equal sources come out in input order
+    merged = heapq.merge(*map(_read_records, runs), key=itemgetter(0))
+    with open(path, mode="w+b") as file, tempfile.TemporaryFile() as offsets:
+        file.write(WORDMAP_HEADER.pack(WORDMAP_MAGIC, WORDMAP_VERSION, 0, 0))
+        offset, count = WORDMAP_HEADER.size, 0
+        for record in _unique_last(merged):
+            offsets.write(WORDMAP_OFFSET.pack(offset))
+            offset += _write_record(file, record)
+            count += 1
+        offsets.seek(0)
+        shutil.copyfileobj(offsets, file)
+        file.seek(0)
+        file.write(WORDMAP_HEADER.pack(WORDMAP_MAGIC, WORDMAP_VERSION, count, offset))
+
+
+class MappedWordmap:
+    """Read-only lookup over a binary wordmap, memory-mapped instead of loaded.
+
+    Source words are found by binary search over the offset index (O(log n)
+    record reads), prefix scans and iteration walk the records in sorted
+    order, and nothing is read up front besides the header. The mapping is
+    shared through the page cache, so processes opening the same file share
+    its memory, and a pickled MappedWordmap reopens its file.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, mode="rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, index = WORDMAP_HEADER.unpack_from(self._mmap)
+        if magic != WORDMAP_MAGIC or version != WORDMAP_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a version {WORDMAP_VERSION} wordmap")
+        self._count = count
+        table = memoryview(self._mmap)[index : index + count * WORDMAP_OFFSET.size]
+        if sys.byteorder == "little":
+            self._offsets = table.cast("Q")
+        else:
+            self._offsets = array("Q", table)
+            self._offsets.byteswap()
+            table.release()
+
+    def __reduce__(self):
+        return type(self), (self.path,)
+
+    def __enter__(self) -> "MappedWordmap":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, word: str) -> bool:
+        return self.__find(word.encode("utf-8")) is not None
+
+    def __getitem__(self, word: str) -> str:
+        idx = self.__find(word.encode("utf-8"))
+        if idx is None:
+            raise KeyError(word)
+        return self.__record(idx)[1]
+
+    def get(self, word: str, default: Optional[str] = None) -> Optional[str]:
+        idx = self.__find(word.encode("utf-8"))
+        return default if idx is None else self.__record(idx)[1]
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def keys(self) -> Iterator[str]:
+        """Source words in sorted order."""
+        return (source for source, _ in self.items())
+
+    def items(self, start: int = 0) -> Iterator[Tuple[str, str]]:
+        """(source, output) pairs in sorted order, from the record at start."""
+        record = self.__record
+        return (record(idx) for idx in range(start, self._count))
+
+    def prefix(self, prefix: str) -> Iterator[Tuple[str, str]]:
+        """(source, output) pairs of the source words starting with prefix."""
+        encoded = prefix.encode("utf-8")
+        key = self.__key
+        idx = bisect_left(range(self._count), encoded, key=key)
+        while idx < self._count and key(idx).startswith(encoded):
+            yield self.__record(idx)
+            idx += 1
+
+    def __key(self, idx: int) -> bytes:
+        offset = self._offsets[idx]
+        source_len, _ = WORDMAP_RECORD.unpack_from(self._mmap, offset)
+        start = offset + WORDMAP_RECORD.size
+        return self._mmap[start : start + source_len]
+
+    def __record(self, idx: int) -> Tuple[str, str]:
+        offset = self._offsets[idx]
+        source_len, output_len = WORDMAP_RECORD.unpack_from(self._mmap, offset)
+        start = offset + WORDMAP_RECORD.size
+        middle = start + source_len
+        return (
+            self._mmap[start:middle].decode("utf-8"),
+            self._mmap[middle : middle + output_len].decode("utf-8"),
+        )
+
+    def __find(self, encoded: bytes) -> Optional[int]:
+        idx = bisect_left(range(self._count), encoded, key=self.__key)
+        if idx < self._count and self.__key(idx) == encoded:
+            return idx
+        return None
+
+
+def labelled_wordmap(
+    labelled_data_path: str | Path, bin_path: str | Path | None = None
+) -> MappedWordmap:
+    """Labelled data (tab-separated word and target lines) as a MappedWordmap.
+
+    The binary wordmap is written to bin_path, by default a file named after
+    the labelled data in the user cache directory (see wordmap_cache_dir), and
+    rebuilt when it is missing or older than the labelled data. Nothing is
+    written next to the labelled data, so it may be read-only.
+    """
+    from .stream import iter_lines
+
+    path = Path(labelled_data_path)
+    if bin_path is None:
+        resolved = str(path.resolve()).encode("utf-8")
+        digest = hashlib.sha256(resolved).hexdigest()[:16]
+        bin_path = wordmap_cache_dir() / f"{path.stem}-{digest}.bin"
+    bin_path = Path(bin_path)
+    if not bin_path.exists() or bin_path.stat().st_mtime < path.stat().st_mtime:
+        bin_path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name and renamed, so that other processes
+        # never map a partly written file
+        temp_path = bin_path.with_name(f"{bin_path.name}.{os.getpid()}.tmp")
+        pairs = (line.strip().split("\t") for line in iter_lines(path) if line.strip())
+        write_wordmap(pairs, temp_path, formats=())
+        os.replace(temp_path.with_suffix(".bin"), bin_path)
+    return MappedWordmap(bin_path)
+
+
+def wordmap_cache_dir() -> Path:
+    """Directory of the binary wordmaps built by labelled_wordmap:
+    $MMT_CACHE_DIR, or mm_transliteration in $XDG_CACHE_HOME (~/.cache)."""
+    if "MMT_CACHE_DIR" in os.environ:
+        return Path(os.environ["MMT_CACHE_DIR"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "mm_transliteration"
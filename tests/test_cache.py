@@ -0,0 +1,83 @@
+from src.mt_ import (
+    CacheInfo,
+    Lexicon,
+    MMTransliteration,
+    PersistentCache,
+    WordCache,
+    rules_version,
+)
+
+
+def test_word_cache_eviction():
+    cache = WordCache(maxsize=2)
+    cache.put("ক", "ꯀ")
+    cache.put("খ", "ꯈ")
+    assert cache.get("ক") == "ꯀ"
+    # খ is now the least recently used word
+    cache.put("গ", "ꯒ")
+    assert "খ" not in cache
+    assert cache.get("খ") is None
+    assert cache.get("গ") == "ꯒ"
+    assert cache.info() == CacheInfo(
+        hits=2, misses=1, evictions=1, maxsize=2, currsize=2
+    )
+    assert cache.hit_rate == 2 / 3
+
+
+def test_word_cache_disabled():
+    cache = WordCache(maxsize=0)
+    assert cache.get_or_compute("ক", str.upper) == "ক"
+    assert len(cache) == 0
+    assert cache.info().misses == 1
+
+
+def test_word_cache_clear():
+    cache = WordCache(maxsize=2)
+    assert cache.get_or_compute("ক", lambda word: "ꯀ") == "ꯀ"
+    assert cache.get_or_compute("ক", lambda word: "-") == "ꯀ"
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info() == CacheInfo(0, 0, 0, 2, 0)
+
+
+def test_persistent_cache_pending(tmp_path):
+    with PersistentCache(tmp_path / "cache.db", "v1", flush_every=100) as cache:
+        cache.put("ক", "ꯀ")
+        # Found before and after being written
+        assert cache.get("ক") == "ꯀ"
+        assert cache.get_many(["ক", "খ"]) == {"ক": "ꯀ"}
+        cache.flush()
+        assert cache.get("ক") == "ꯀ"
+        assert cache.get_many(["ক", "খ"]) == {"ক": "ꯀ"}
+        assert len(cache) == 1
+
+
+def test_persistent_cache_version(tmp_path):
+    path = tmp_path / "cache.db"
+    with PersistentCache(path, "v1") as cache:
+        cache.put("ক", "ꯀ")
+    # Entries of other versions are kept, but never returned
+    with PersistentCache(path, "v2") as cache:
+        assert cache.get("ক") is None
+        cache.put("ক", "-")
+    with PersistentCache(path, "v1") as cache:
+        assert cache.get("ক") == "ꯀ"
+        assert cache.prune() == 1
+    with PersistentCache(path, "v2") as cache:
+        assert len(cache) == 0
+
+
+def test_rules_version(tmp_path):
+    lexicon = Lexicon.build([("কলম", "A")])
+    assert rules_version() == rules_version()
+    assert rules_version(lexicon) != rules_version()
+
+    # Transliterators with another lexicon do not read each other's outputs
+    path = tmp_path / "cache.db"
+    output = MMTransliteration().transliterate("কলম")
+    with MMTransliteration(cache_path=path) as mt:
+        assert mt.transliterate("কলম", use_cache=True) == output
+    with MMTransliteration(cache_path=path, lexicon=lexicon) as mt:
+        assert mt.transliterate("কলম", use_cache=True) == "A"
+    with MMTransliteration(cache_path=path) as mt:
+        assert mt.transliterate("কলম", use_cache=True) == output
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from src.mt_ import MMTransliteration
+from src.mt_.cli import TOKEN_FIELDS, TRANSLITERATE_FIELDS, main
+
+WORDS = ["কলম", "কি,", "অনি০১২"]
+
+
+@pytest.fixture
+def words_path(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("\n".join(WORDS) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def outputs():
+    mt = MMTransliteration()
+    return {word: mt.transliterate(word) for word in [*WORDS, "কি"]}
+
+
+def run(capsys, *argv: str):
+    assert main(list(argv)) == 0
+    return capsys.readouterr()
+
+
+def read_lines(text: str) -> list:
+    assert text.endswith("\n")
+    return text.split("\n")[:-1]
+
+
+def test_transliterate_text(capsys, tmp_path, outputs):
+    path = tmp_path / "text.txt"
+    path.write_text("কলম, (কি)\n\nabc কলম\n", encoding="utf-8")
+    lines = read_lines(run(capsys, "transliterate", str(path)).out)
+    assert lines == [
+        f"{outputs['কলম']}, ({outputs['কি']})",
+        "",
+        f"abc {outputs['কলম']}",
+    ]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_transliterate_tsv(capsys, words_path, outputs, jobs):
+    argv = ["transliterate", words_path, "--format", "tsv", "--jobs", jobs]
+    lines = read_lines(run(capsys, *argv).out)
+    assert lines == [f"{word}\t{outputs[word]}" for word in WORDS]
+
+
+def test_transliterate_jsonl(capsys, words_path, outputs, tmp_path):
+    path = tmp_path / "output.jsonl"
+    run(capsys, "transliterate", words_path, "--format", "jsonl", "-o", str(path))
+    rows = list(map(json.loads, read_lines(path.read_text(encoding="utf-8"))))
+    assert rows == [dict(zip(TRANSLITERATE_FIELDS, (w, outputs[w]))) for w in WORDS]
+
+
+def test_tokens(capsys, words_path):
+    result = run(capsys, "tokens", words_path, "--format", "jsonl")
+    rows = list(map(json.loads, read_lines(result.out)))
+    assert [tuple(row) for row in rows] == [TOKEN_FIELDS] * len(WORDS)
+    assert [row["word"] for row in rows] == WORDS
+    for row in rows:
+        assert row["tags"] == len(row["word"]) + 1
+        assert row["complete"] is (row["unidentified"] == 0)
+    num_completed = sum(row["complete"] for row in rows)
+    assert f"{num_completed}/{len(WORDS)} (Completed)" in result.err
+
+    lines = read_lines(run(capsys, "tokens", words_path).out)
+    assert lines == ["\t".join(map(str, row.values())) for row in rows]
+
+
+def test_evaluate(capsys, tmp_path, outputs):
+    labelled = tmp_path / "labelled.txt"
+    labelled.write_text(f"কলম\t{outputs['কলম']}\nকি\t-\n", encoding="utf-8")
+    wordmap = str(tmp_path / "labelled.bin")
+    argv = ["evaluate", str(labelled), "--wordmap", wordmap, "--format", "jsonl"]
+    metrics = json.loads(run(capsys, *argv).out)
+    assert metrics["words"] == 2
+    assert metrics["word_mismatches"] == 1
+    assert metrics["WMR"] == 50.0
+
+
+@pytest.mark.parametrize("option", [["--jobs", "-1"], ["--chunk-size", "0"]])
+def test_invalid_counts(capsys, words_path, option):
+    with pytest.raises(SystemExit):
+        main(["transliterate", words_path, *option])
+    assert "must be at least" in capsys.readouterr().err
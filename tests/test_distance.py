@@ -0,0 +1,41 @@
+import random
+
+from src.mt_ import compute_metrics, levenshtein, levenshtein_batch
+
+
+def dp_levenshtein(a: str, b: str) -> int:
+    row = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        previous, row[0] = row[0], i
+        for j, char_b in enumerate(b, 1):
+            previous, row[j] = row[j], min(
+                row[j] + 1, row[j - 1] + 1, previous + (char_a != char_b)
+            )
+    return row[-1]
+
+
+def test_levenshtein():
+    rng = random.Random(0)
+    pairs = [
+        (
+            "".join(rng.choices("কখগaꯀ", k=rng.randrange(12))),
+            "".join(rng.choices("কখগaꯀ", k=rng.randrange(90))),
+        )
+        for _ in range(500)
+    ]
+    assert [levenshtein(a, b) for a, b in pairs] == [
+        dp_levenshtein(a, b) for a, b in pairs
+    ]
+    assert levenshtein_batch(pairs) == [dp_levenshtein(a, b) for a, b in pairs]
+
+
+def test_compute_metrics():
+    target = {"কলম": "ꯀꯂꯝ", "কি": "ꯀꯤ", "অ": "ꯑ"}
+    output = {"কলম": "ꯀꯂꯃ", "কি": "ꯀꯤ"}
+    metrics = compute_metrics(target, output)
+    assert metrics["words"] == 3
+    assert metrics["word_mismatches"] == 2
+    assert metrics["chars"] == 3 + 2 + 1
+    assert metrics["edit_distance"] == 1 + 0 + 1
+    assert metrics["WMR"] == 2 / 3 * 100
+    assert metrics["CER"] == 2 / 6 * 100
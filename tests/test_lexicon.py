@@ -0,0 +1,53 @@
+import pickle
+
+from src.mt_ import Lexicon, MMTransliteration
+from src.mt_.lexicon import open_lexicon
+
+LEXICON_PAIRS = [
+    ("কলম", "A"),
+    ("কল", "B"),
+    ("কলমগী", "C"),
+    ("অকায়", "A"),
+    ("ক", "D"),
+    ("কলম", "E"),
+]
+
+
+def check_lexicon(lexicon: Lexicon) -> None:
+    expected = dict(LEXICON_PAIRS)
+    assert len(lexicon) == len(expected)
+    for word, output in expected.items():
+        assert lexicon.get(word) == output
+    for word in ("", "কলমগ", "কলমগীর", "খ", "অকা"):
+        assert word not in lexicon
+        assert lexicon.get(word, "-") == "-"
+
+
+def test_lexicon(tmp_path):
+    lexicon = Lexicon.build(LEXICON_PAIRS)
+    check_lexicon(lexicon)
+    check_lexicon(Lexicon.from_buffer(lexicon.to_bytes()))
+    check_lexicon(pickle.loads(pickle.dumps(lexicon)))
+
+    lexicon.save(tmp_path / "words.lex")
+    loaded = Lexicon.load(tmp_path / "words.lex")
+    check_lexicon(loaded)
+    assert loaded.fingerprint() == lexicon.fingerprint()
+    check_lexicon(pickle.loads(pickle.dumps(loaded)))
+    loaded.close()
+
+
+def test_lexicon_labelled(tmp_path):
+    labelled = tmp_path / "labelled.txt"
+    labelled.write_text(
+        "".join(f"{word}\t{output}\n" for word, output in LEXICON_PAIRS),
+        encoding="utf-8",
+    )
+    check_lexicon(open_lexicon(labelled))
+
+
+def test_lexicon_override():
+    lexicon = Lexicon.build(LEXICON_PAIRS)
+    mt, rules = MMTransliteration(lexicon=lexicon), MMTransliteration()
+    assert mt.transliterate("কলম") == "E"
+    assert mt.transliterate("কলমগ") == rules.transliterate("কলমগ")
@@ -0,0 +1,78 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.mt_ import Lexicon, MMTransliteration
+from src.mt_.parallel import iter_chunked, map_ordered, shared_lexicon
+
+WORDS = ["কলম", "কি,", "অনি০১২", "কলম", "", "পড়া", "abc"] * 30
+
+
+def test_iter_chunked():
+    assert list(iter_chunked("abcdefg", 3)) == [["a", "b", "c"], ["d", "e", "f"], ["g"]]
+    assert list(iter_chunked([], 3)) == []
+
+
+def test_map_ordered():
+    submitted = []
+
+    def chunks():
+        for idx in range(20):
+            submitted.append(idx)
+            yield [idx]
+
+    def slow_first(chunk):
+        # Earlier chunks finish last
+        time.sleep((20 - chunk[0]) / 2000)
+        return chunk
+
+    consumed = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for output in map_ordered(executor, slow_first, chunks(), max_pending=4):
+            # At most max_pending chunks are submitted ahead of the consumer
+            assert len(submitted) - len(consumed) <= 4
+            consumed.extend(output)
+    assert consumed == list(range(20))
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_transliterate_batch(use_cache):
+    serial = MMTransliteration().transliterate_batch(WORDS, jobs=1)
+    assert serial == [MMTransliteration().transliterate(word) for word in WORDS]
+    outputs = MMTransliteration().transliterate_batch(
+        WORDS, jobs=2, chunk_size=7, use_cache=use_cache
+    )
+    assert outputs == serial
+
+
+@pytest.mark.parametrize("saved", [False, True])
+def test_lexicon_workers(tmp_path, saved):
+    rules = MMTransliteration()
+    # Lexicon outputs differ from the rules for every other distinct word
+    words = list(dict.fromkeys(WORDS))
+    lexicon = Lexicon.build((word, f"<{word}>") for word in words[::2])
+    if saved:
+        lexicon.save(tmp_path / "words.lex")
+        lexicon = Lexicon.load(tmp_path / "words.lex")
+    mt = MMTransliteration(lexicon=lexicon)
+    expected = [lexicon.get(word) or rules.transliterate(word) for word in WORDS]
+    assert mt.transliterate_batch(WORDS, jobs=1) == expected
+    with mt.worker_pool(jobs=2) as executor:
+        for _ in range(2):
+            outputs = mt.transliterate_batch(
+                WORDS, chunk_size=5, use_cache=False, executor=executor
+            )
+            assert outputs == expected
+
+
+def test_shared_lexicon():
+    lexicon = Lexicon.build([("কলম", "A")])
+    with shared_lexicon(lexicon) as mapped:
+        # Workers map a temporary file, removed after the block
+        assert mapped.path is not None and mapped.path.exists()
+        assert mapped.get("কলম") == "A"
+        assert mapped.fingerprint() == lexicon.fingerprint()
+    assert not mapped.path.exists()
+    with shared_lexicon(None) as mapped:
+        assert mapped is None
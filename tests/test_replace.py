@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from src.mt_ import CharmapReplacer, compile_charmap
+
+VIRAMA = "্"
+CHARMAP = {"ab": "X", "abc": "Y", "a": "1", "b": "2", "c": VIRAMA, "d": VIRAMA * 2}
+
+
+def reference_rewrite(text: str, charmap: dict) -> str:
+    """Leftmost-longest replacement one position at a time."""
+    keys = sorted(charmap, key=len, reverse=True)
+    pieces, pos = [], 0
+    while pos < len(text):
+        key = next((key for key in keys if text.startswith(key, pos)), None)
+        if key is None:
+            pieces.append(text[pos])
+            pos += 1
+        else:
+            pieces.append(charmap[key])
+            pos += len(key)
+    return "".join(pieces)
+
+
+def collapse(text: str) -> str:
+    while VIRAMA * 2 in text:
+        text = text.replace(VIRAMA * 2, VIRAMA)
+    return text
+
+
+@pytest.fixture(scope="module")
+def texts():
+    rng = random.Random(0)
+    return [
+        "".join(rng.choices("abcdx" + VIRAMA, k=rng.randrange(40))) for _ in range(300)
+    ]
+
+
+def test_rewrite(texts):
+    replacer = CharmapReplacer(CHARMAP)
+    assert [replacer.rewrite(text) for text in texts] == [
+        reference_rewrite(text, CHARMAP) for text in texts
+    ]
+
+
+def test_rewrite_virama(texts):
+    replacer = CharmapReplacer(CHARMAP, virama=VIRAMA)
+    assert [replacer.rewrite(text) for text in texts] == [
+        collapse(reference_rewrite(text, CHARMAP)) for text in texts
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+def test_rewrite_stream(texts, chunk_size):
+    # Keys and repeated viramas spanning chunk boundaries
+    replacer = CharmapReplacer(CHARMAP, virama=VIRAMA)
+    for text in texts:
+        chunks = [
+            text[idx : idx + chunk_size] for idx in range(0, len(text), chunk_size)
+        ]
+        assert "".join(replacer.rewrite_stream(chunks)) == replacer.rewrite(text)
+
+
+def test_compile_charmap():
+    charmap = {"ab": "X"}
+    replacer = compile_charmap(charmap)
+    assert compile_charmap(dict(charmap)) is replacer
+    assert compile_charmap(charmap, virama=VIRAMA) is not replacer
+    # A charmap changed in place is compiled again
+    charmap["a"] = "1"
+    assert compile_charmap(charmap).rewrite("abac") == "X1c"
@@ -0,0 +1,42 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from src.mt_ import M2B, MMTransliteration
+
+WORDS_PATH = Path(__file__).parent.parent / "data/words.txt"
+
+# Words spelt with the letters M2B prefers, which round trip exactly, digits
+# and other characters included
+ROUND_TRIPS = ["কলম", "আংগম", "খোংজোম", "সিংহ", "অনি০১২", "কি,"]
+
+
+@pytest.fixture(scope="module")
+def sample():
+    words = WORDS_PATH.read_text(encoding="utf-8").split("\n")
+    return random.Random(0).sample(words, 3000)
+
+
+@pytest.mark.parametrize("word", ROUND_TRIPS)
+def test_round_trip(word):
+    assert M2B.shared().transliterate(MMTransliteration().transliterate(word)) == word
+
+
+def test_round_trip_sample(sample):
+    # Letters with the same phoneme (e.g. ত and ট) come back as one of them,
+    # so compare the Meetei Mayek spellings
+    mt, m2b = MMTransliteration(), M2B.shared()
+    outputs = mt.transliterate_batch(sample, jobs=1)
+    again = mt.transliterate_batch(m2b.transliterate_batch(outputs), jobs=1)
+    matches = sum(output == other for output, other in zip(outputs, again))
+    assert matches / len(sample) > 0.9
+
+
+def test_stream(sample):
+    m2b = M2B.shared()
+    text = " ".join(MMTransliteration().transliterate_batch(sample, jobs=1))
+    text = f"{text[:5000]}, 12\n{text[5000:]}\n"
+    chunks = [text[idx : idx + 100] for idx in range(0, len(text), 100)]
+    streamed = "".join(m2b.transliterate_stream(chunks, chunk_size=37))
+    assert streamed == m2b.transliterate(text)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from src.lon_ import MMPhoneme
+from src.mt_ import CorpusSonority, corpus_sonority, phonemize, syllabify
+
+# Words with punctuation, a lone virama and no characters at all
+WORDS = ["কলম", "কি,", "্", "", "(কি)ক্ত", "পড়া"]
+
+
+def expected_syllables(word: str) -> list:
+    """Phonemes of the syllables of the spelt runs of a word."""
+    syllables = []
+    for run in word.replace(",", " ").replace("(", " ").replace(")", " ").split():
+        for syllable in phonemize(syllabify(run)).split("/"):
+            if syllable.split():
+                syllables.append(syllable.split())
+    return syllables
+
+
+@pytest.fixture(scope="module")
+def sonority():
+    return corpus_sonority(WORDS)
+
+
+def test_corpus_sonority(sonority):
+    mmP = MMPhoneme.shared()
+    assert sonority.num_words == len(WORDS)
+    # No empty syllables
+    assert (np.diff(sonority.syllable_offsets) > 0).all()
+    for idx, word in enumerate(WORDS):
+        syllables = expected_syllables(word)
+        start, end = sonority.word_offsets[idx : idx + 2]
+        assert end - start == len(syllables)
+        phonemes = [phoneme for syllable in syllables for phoneme in syllable]
+        assert sonority.word_profile(idx).tolist() == (
+            mmP.sonority_profile(mmP.get_ids(phonemes)).tolist()
+        )
+
+
+def test_distributions(sonority):
+    summary = sonority.summary()
+    num_phonemes = len(sonority.values)
+    roles = ("onset", "nucleus", "coda")
+    assert sum(summary[f"{role}_sonority"].sum() for role in roles) == num_phonemes
+    assert summary["peaks"].sum() == sonority.num_words
+    assert summary["onset_violations"].sum() == sonority.num_syllables
+
+
+def test_save_load(sonority, tmp_path):
+    sonority.save_npz(tmp_path / "sonority.npz")
+    loaded = CorpusSonority.load(tmp_path / "sonority.npz")
+    assert loaded.scale == sonority.scale
+    for name in ("values", "roles", "syllable_offsets", "word_offsets"):
+        assert (getattr(loaded, name) == getattr(sonority, name)).all()
@@ -0,0 +1,71 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from src.mt_ import MMTransliteration, ShapeSyllabifier, SyllableTransducer
+
+WORDS_PATH = Path(__file__).parent.parent / "data/words.txt"
+
+# Words with characters that have no phoneme: digits, punctuation, a lone
+# virama and text outside the Bengali block
+EDGE_CASES = {
+    "১৯৯৯": "꯱꯹꯹꯹",
+    "কি,": "ꯀꯤ,",
+    "(কি)": "(ꯀꯤ)",
+    "অনি০১২": "ꯑꯅꯤ꯰꯱꯲",
+    "্": "",
+    "abc": "abc",
+}
+
+# Combining marks: nuktas of NFC text (ড়, ঢ় and য় as base letter and nukta),
+# candrabindus and visargas
+COMBINING_MARKS = {
+    "পড\u09bcা": "ꯄꯔꯥ",
+    "প\u09dcা": "ꯄꯔꯥ",
+    "গাঢ\u09bc": "ꯒꯥꯔ",
+    "অকায\u09bc": "ꯑꯀꯥꯌ",
+    "অকা\u09df": "ꯑꯀꯥꯌ",
+    "চাঁদ": "ꯆꯥꯗ",
+    "ডাঃ": "ꯗꯥ",
+}
+
+
+@pytest.fixture(scope="module")
+def sample():
+    words = WORDS_PATH.read_text(encoding="utf-8").split("\n")
+    return (
+        random.Random(0).sample(words, 3000) + list(EDGE_CASES) + list(COMBINING_MARKS)
+    )
+
+
+# Shape and transducer tables against the tagging passes and the step path
+@pytest.mark.parametrize("maxsize", [0, 64, 1 << 16])
+def test_shape_verify(sample, maxsize):
+    assert ShapeSyllabifier(maxsize).verify(sample) == []
+
+
+@pytest.mark.parametrize("maxsize", [0, 64, 1 << 16])
+def test_transducer_verify(sample, maxsize):
+    assert SyllableTransducer(maxsize).verify(sample) == []
+
+
+def test_transducer_bounded(sample):
+    transducer = SyllableTransducer(maxsize=64)
+    transducer.transliterate_batch(sample)
+    assert max(transducer.info()) <= 64
+
+
+@pytest.mark.parametrize("word, output", EDGE_CASES.items())
+def test_pass_through(word, output):
+    assert MMTransliteration().transliterate(word) == output
+
+
+@pytest.mark.parametrize("word, output", COMBINING_MARKS.items())
+def test_combining_marks(word, output):
+    assert MMTransliteration().transliterate(word) == output
+
+
+def test_stream_pass_through():
+    mt = MMTransliteration()
+    assert "".join(mt.transliterate_stream(["কি, ১৯৯৯\n"])) == "ꯀꯤ, ꯱꯹꯹꯹\n"
@@ -0,0 +1,123 @@
+import csv
+import json
+import os
+import pickle
+import random
+import struct
+
+import pytest
+
+from src.mt_ import MappedWordmap, labelled_wordmap, write_wordmap
+from src.mt_.wordmap import (
+    CSV_FIELDS,
+    WORDMAP_FIELDS,
+    WORDMAP_HEADER,
+    WORDMAP_MAGIC,
+    WORDMAP_RECORD,
+)
+
+
+@pytest.fixture(scope="module")
+def pairs():
+    rng = random.Random(0)
+    return [
+        ("".join(rng.choices("কখগঅ", k=rng.randrange(1, 6))), str(idx))
+        for idx in range(2000)
+    ]
+
+
+def read_binary(path) -> list:
+    """Records of a binary wordmap, in file order."""
+    data = path.read_bytes()
+    magic, _, count, index_offset = WORDMAP_HEADER.unpack_from(data)
+    assert magic == WORDMAP_MAGIC
+    offsets = struct.unpack_from(f"<{count}Q", data, index_offset)
+    records = []
+    for offset in offsets:
+        source_len, output_len = WORDMAP_RECORD.unpack_from(data, offset)
+        start = offset + WORDMAP_RECORD.size
+        source = data[start : start + source_len]
+        output = data[start + source_len : start + source_len + output_len]
+        records.append((source.decode("utf-8"), output.decode("utf-8")))
+    return records
+
+
+def test_write_wordmap(tmp_path, pairs):
+    # Small runs, so the binary wordmap is merged from many of them
+    assert write_wordmap(pairs, tmp_path / "wordmap", run_size=100) == len(pairs)
+
+    lines = (tmp_path / "wordmap.txt").read_text(encoding="utf-8").split("\n")
+    assert lines == [f"{word}\t{output}" for word, output in pairs] + [""]
+    with open(tmp_path / "wordmap.jsonl", encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == [
+            dict(zip(WORDMAP_FIELDS, pair)) for pair in pairs
+        ]
+    with open(tmp_path / "wordmap.csv", encoding="utf-8", newline="") as file:
+        assert list(map(tuple, csv.reader(file))) == [CSV_FIELDS, *pairs]
+
+    # One record per word, the last output written, sorted by UTF-8 bytes
+    assert read_binary(tmp_path / "wordmap.bin") == sorted(
+        dict(pairs).items(), key=lambda item: item[0].encode("utf-8")
+    )
+
+
+def test_write_wordmap_formats(tmp_path, pairs):
+    write_wordmap(pairs, tmp_path / "wordmap", formats=["jsonl"], binary=False)
+    assert [path.name for path in tmp_path.iterdir()] == ["wordmap.jsonl"]
+
+
+def test_mapped_wordmap(tmp_path, pairs):
+    write_wordmap(pairs, tmp_path / "wordmap", formats=(), run_size=100)
+    expected = dict(pairs)
+    with MappedWordmap(tmp_path / "wordmap.bin") as wordmap:
+        assert len(wordmap) == len(expected)
+        assert list(wordmap.items()) == read_binary(tmp_path / "wordmap.bin")
+        assert list(wordmap) == [word for word, _ in wordmap.items()]
+        for word, output in expected.items():
+            assert word in wordmap
+            assert wordmap[word] == output
+        assert "ঘ" not in wordmap
+        assert wordmap.get("ঘ") is None
+        with pytest.raises(KeyError):
+            wordmap["ঘ"]
+        assert list(wordmap.prefix("কখ")) == sorted(
+            (item for item in expected.items() if item[0].startswith("কখ")),
+            key=lambda item: item[0].encode("utf-8"),
+        )
+        assert list(wordmap.prefix("ঘ")) == []
+        with pickle.loads(pickle.dumps(wordmap)) as unpickled:
+            assert dict(unpickled.items()) == expected
+
+
+def test_mapped_wordmap_invalid(tmp_path):
+    (tmp_path / "wordmap.bin").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        MappedWordmap(tmp_path / "wordmap.bin")
+
+
+def test_labelled_wordmap(tmp_path):
+    labelled = tmp_path / "labelled.txt"
+    labelled.write_text("কলম\tꯀꯂꯃ\nঅকায়\tꯑꯀꯥꯢ\n", encoding="utf-8")
+    bin_path = tmp_path / "cache/labelled.bin"
+    with labelled_wordmap(labelled, bin_path) as wordmap:
+        assert dict(wordmap.items()) == {"কলম": "ꯀꯂꯃ", "অকায়": "ꯑꯀꯥꯢ"}
+    # Nothing is written next to the labelled data
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["cache", "labelled.txt"]
+    assert [path.name for path in bin_path.parent.iterdir()] == ["labelled.bin"]
+
+    # Rebuilt once the labelled data is newer
+    labelled.write_text("কলম\tꯀꯂꯃ\n", encoding="utf-8")
+    stat = bin_path.stat()
+    os.utime(labelled, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    with labelled_wordmap(labelled, bin_path) as wordmap:
+        assert dict(wordmap.items()) == {"কলম": "ꯀꯂꯃ"}
+
+
+def test_labelled_wordmap_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("MMT_CACHE_DIR", str(tmp_path / "cache"))
+    labelled = tmp_path / "labelled.txt"
+    labelled.write_text("কলম\tꯀꯂꯃ\n", encoding="utf-8")
+    with labelled_wordmap(labelled) as wordmap:
+        assert wordmap.path.parent == tmp_path / "cache"
+        assert wordmap.path.name.startswith("labelled-")
+        assert wordmap["কলম"] == "ꯀꯂꯃ"